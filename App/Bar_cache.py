@@ -0,0 +1,178 @@
+# bar_cache.py
+
+import os
+import json
+import pandas as pd
+from Logger import System_Log
+from Config.Config import BAR_CACHE_DIR
+
+# Setup the logger
+system_logger = System_Log.setup_logger('bar_cache')
+
+class BarCache:
+    def __init__(self, cache_dir=BAR_CACHE_DIR):
+        """
+        Initialise the on-disk OHLCV cache.
+        Each (data source, ticker) is a partition directory of Parquet part files, alongside a
+        small JSON file recording the half-open date range [start, end) already fetched.
+        """
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _partition(self, source, ticker):
+        return os.path.join(self.cache_dir, source, ticker)
+
+    def _parts(self, partition):
+        if not os.path.isdir(partition):
+            return []
+        return sorted(os.path.join(partition, name) for name in os.listdir(partition) if name.endswith('.parquet'))
+
+    def _write_part(self, partition, data):
+        os.makedirs(partition, exist_ok=True)
+        parts = self._parts(partition)
+        number = int(os.path.basename(parts[-1])[5:10]) + 1 if parts else 0
+        data.to_parquet(os.path.join(partition, f"part-{number:05d}.parquet"), index=False)
+
+    def _compact(self, partition):
+        """
+        Size-tiered compaction: merge the newest parts for as long as the part before them is
+        no larger than they are together. Parts stay in decreasing size order, so a backfill
+        of n pages keeps O(log n) parts and rewrites each bar O(log n) times; the large, old
+        parts are left alone until the recent ones have grown as big.
+        """
+        parts = self._parts(partition)
+        sizes = [os.path.getsize(part) for part in parts]
+        first, total = len(parts) - 1, sizes[-1]
+        while first > 0 and sizes[first - 1] <= total:
+            first -= 1
+            total += sizes[first]
+        if first == len(parts) - 1:
+            return
+        compacted_path = os.path.join(partition, "compacted.tmp")
+        self._read_parts(parts[first:]).to_parquet(compacted_path, index=False)
+        # The merged part takes the place of the oldest one it replaces, so later parts still win
+        os.replace(compacted_path, parts[first])
+        for part in parts[first + 1:]:
+            os.remove(part)
+
+    @staticmethod
+    def _read_parts(parts):
+        data = pd.concat([pd.read_parquet(part) for part in parts], ignore_index=True)
+        # Later parts win when the same bar was fetched twice
+        return data.drop_duplicates(subset='Date', keep='last').sort_values('Date').reset_index(drop=True)
+
+    @staticmethod
+    def _clamp_end(end_date):
+        # Today's bar is still forming, so coverage never extends past the start of today
+        return min(pd.Timestamp(end_date), pd.Timestamp.today().normalize())
+
+    @staticmethod
+    def _date_bounds(dates, start_date, end_date):
+        start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+        tz = getattr(dates.dt, 'tz', None)
+        if tz is not None:
+            start, end = start.tz_localize(tz), end.tz_localize(tz)
+        return (dates >= start) & (dates < end)
+
+    def coverage(self, source, ticker):
+        """
+        Return the cached (start, end) date range for a ticker, or None if nothing is cached.
+        """
+        meta_path = os.path.join(self._partition(source, ticker), 'coverage.json')
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            meta = json.load(f)
+        return pd.Timestamp(meta['start']), pd.Timestamp(meta['end'])
+
+    def missing_ranges(self, source, ticker, start_date, end_date):
+        """
+        Return the (start, end) ranges of [start_date, end_date) that still need fetching.
+        Ranges are chosen so that the cached coverage always stays contiguous.
+        """
+        try:
+            start, end = pd.Timestamp(start_date), self._clamp_end(end_date)
+            if start >= end:
+                return []
+            covered = self.coverage(source, ticker)
+            if covered is None:
+                return [(start, end)]
+
+            cov_start, cov_end = covered
+            ranges = []
+            if start < cov_start:
+                ranges.append((start, cov_start))
+            if end > cov_end:
+                ranges.append((cov_end, end))
+            return ranges
+        except Exception as e:
+            system_logger.error(f"Error computing missing ranges for {ticker}: {e}")
+            raise
+
+    def load(self, source, ticker, start_date, end_date):
+        """
+        Load cached bars for a ticker within [start_date, end_date).
+        """
+        try:
+            parts = self._parts(self._partition(source, ticker))
+            if not parts:
+                return pd.DataFrame()
+            data = self._read_parts(parts)
+            data = data[self._date_bounds(data['Date'], start_date, end_date)].reset_index(drop=True)
+            system_logger.info(f"Loaded {len(data)} cached bars for {ticker} ({source})")
+            return data
+        except Exception as e:
+            system_logger.error(f"Error loading cached bars for {ticker}: {e}")
+            raise
+
+    def page_sink(self, source, ticker, start_date):
+        """
+        Return a callable that writes each page of bars fetched from start_date straight into
+        the ticker's partition. Coverage is extended page by page up to the last bar written,
+        so an interrupted download never records bars it did not receive.
+        """
+        def write_page(page):
+            if not page.empty:
+                dates = pd.to_datetime(page['Date'])
+                if dates.dt.tz is not None:
+                    dates = dates.dt.tz_convert('UTC').dt.tz_localize(None)
+                self.merge(source, ticker, page, start_date, dates.max() + pd.Timedelta(1, 'ns'))
+        return write_page
+
+    def merge(self, source, ticker, data, start_date, end_date):
+        """
+        Merge freshly fetched bars into the cache and extend the recorded coverage.
+        Only a range that returned bars is recorded as covered: an empty frame (a failed or
+        empty fetch) leaves the coverage unchanged, so the range is requested again next time.
+        """
+        try:
+            if data.empty:
+                system_logger.info(f"No bars returned for {ticker} ({source}) from {start_date} to {end_date}; coverage unchanged")
+                return
+
+            partition = self._partition(source, ticker)
+            os.makedirs(partition, exist_ok=True)
+            self._write_part(partition, data)
+            self._compact(partition)
+
+            start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+            covered = self.coverage(source, ticker)
+            if covered is not None:
+                start, end = min(start, covered[0]), max(end, covered[1])
+            with open(os.path.join(partition, 'coverage.json'), 'w') as f:
+                json.dump({'start': start.isoformat(), 'end': end.isoformat()}, f)
+
+            system_logger.info(f"Cache for {ticker} ({source}) now covers {start.date()} to {end.date()}")
+        except Exception as e:
+            system_logger.error(f"Error merging bars into cache for {ticker}: {e}")
+            raise
+
+# Example usage:
+# cache = BarCache()
+# for gap_start, gap_end in cache.missing_ranges('yfinance', 'AAPL', '2022-01-01', '2022-12-31'):
+#     cache.merge('yfinance', 'AAPL', DataHandler.load_from_yfinance('AAPL', gap_start, gap_end), gap_start, gap_end)
+# data = cache.load('yfinance', 'AAPL', '2022-01-01', '2022-12-31')
+#
+# Streaming a long minute-bar backfill page by page:
+# DataHandler.load_from_alpaca('AAPL', '2018-01-01', '2023-01-01', key, secret, url, timeframe='minute',
+#                              sink=cache.page_sink('alpaca_minute', 'AAPL', '2018-01-01'))
@@ -0,0 +1,142 @@
+# bar_store.py
+
+import os
+import json
+import numpy as np
+import pandas as pd
+from Logger import System_Log
+from Config.Config import BAR_STORE_DIR
+
+# Setup the logger
+system_logger = System_Log.setup_logger('bar_store')
+
+class BarStore:
+    """
+    Memory-mapped OHLCV store shared by worker processes.
+    Each column is one contiguous binary file holding every ticker back to back, and
+    index.json maps ticker -> (offset, length). Readers map the files read-only, so slices
+    handed to FeatureEngineering, Indicators or SignalGenerator are views, not copies.
+    Pickling a BarStore only carries its directory and index, never the bars.
+    """
+    COLUMNS = {
+        'Date': np.dtype('datetime64[ns]'),
+        'Open': np.dtype('float64'),
+        'High': np.dtype('float64'),
+        'Low': np.dtype('float64'),
+        'Close': np.dtype('float64'),
+        'Volume': np.dtype('float64'),
+    }
+    INDEX_FILE = 'index.json'
+
+    def __init__(self, directory=BAR_STORE_DIR):
+        """Open (or create) the store in directory."""
+        self.directory = directory
+        os.makedirs(self.directory, exist_ok=True)
+        self.index = self._read_index()
+        self._arrays = None
+
+    def __getstate__(self):
+        return {'directory': self.directory, 'index': self.index}
+
+    def __setstate__(self, state):
+        self.directory = state['directory']
+        self.index = state['index']
+        self._arrays = None
+
+    def _column_path(self, column):
+        return os.path.join(self.directory, f"{column}.bin")
+
+    def _read_index(self):
+        path = os.path.join(self.directory, self.INDEX_FILE)
+        if not os.path.exists(path):
+            return {'length': 0, 'tickers': {}}
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_index(self):
+        path = os.path.join(self.directory, self.INDEX_FILE)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(self.index, f)
+        os.replace(path + '.tmp', path)
+
+    def append(self, frames):
+        """
+        Append tickers to the store.
+        frames is a dict or an iterable of (ticker, data) pairs, such as DataHandler.run_many,
+        so bars are written as they arrive without holding the whole universe in memory.
+        """
+        try:
+            items = frames.items() if isinstance(frames, dict) else frames
+            handles = {column: open(self._column_path(column), 'ab') for column in self.COLUMNS}
+            try:
+                for ticker, data in items:
+                    if ticker in self.index['tickers']:
+                        raise ValueError(f"Ticker {ticker} is already stored in {self.directory}.")
+                    dates = pd.to_datetime(data['Date'])
+                    if dates.dt.tz is not None:
+                        dates = dates.dt.tz_convert('UTC').dt.tz_localize(None)
+                    columns = {'Date': dates.to_numpy(dtype=self.COLUMNS['Date'])}
+                    for column in self.COLUMNS:
+                        if column != 'Date':
+                            columns[column] = data[column].to_numpy(dtype=self.COLUMNS[column])
+                    for column, values in columns.items():
+                        handles[column].write(np.ascontiguousarray(values).tobytes())
+
+                    self.index['tickers'][ticker] = [self.index['length'], len(data)]
+                    self.index['length'] += len(data)
+            finally:
+                for handle in handles.values():
+                    handle.close()
+                self._write_index()
+                self._arrays = None
+
+            system_logger.info(f"Bar store at {self.directory} now holds {len(self.index['tickers'])} tickers ({self.index['length']} bars).")
+            return self
+        except Exception as e:
+            system_logger.error(f"Error writing bars to store: {e}")
+            raise
+
+    def _columns(self):
+        if self._arrays is None:
+            length = self.index['length']
+            self._arrays = {
+                column: np.memmap(self._column_path(column), dtype=dtype, mode='r', shape=(length,))
+                if length else np.empty(0, dtype=dtype)
+                for column, dtype in self.COLUMNS.items()
+            }
+        return self._arrays
+
+    def tickers(self):
+        """Return the tickers held in the store."""
+        return list(self.index['tickers'])
+
+    def arrays(self, ticker, start_date=None, end_date=None):
+        """
+        Return {column: read-only view} for a ticker, optionally limited to [start_date, end_date).
+        """
+        try:
+            offset, length = self.index['tickers'][ticker]
+            columns = {column: values[offset:offset + length] for column, values in self._columns().items()}
+            if start_date is not None or end_date is not None:
+                dates = columns['Date']
+                lo = np.searchsorted(dates, np.datetime64(pd.Timestamp(start_date))) if start_date is not None else 0
+                hi = np.searchsorted(dates, np.datetime64(pd.Timestamp(end_date))) if end_date is not None else length
+                columns = {column: values[lo:hi] for column, values in columns.items()}
+            return columns
+        except KeyError:
+            system_logger.error(f"Ticker {ticker} not found in bar store {self.directory}")
+            raise
+
+    def frame(self, ticker, start_date=None, end_date=None):
+        """
+        Return a DataFrame in the DataHandler schema whose columns are views on the store.
+        The underlying arrays are read-only; copy the frame before modifying OHLCV values in place.
+        """
+        return pd.DataFrame(self.arrays(ticker, start_date, end_date), copy=False)
+
+# Example usage:
+# store = BarStore().append(DataHandler.run_many(['AAPL', 'MSFT'], '2022-01-01', '2022-12-31'))
+# def compute_features(store, ticker):
+#     return FeatureEngineering.engineer_features(store.frame(ticker))
+# with ProcessPoolExecutor() as executor:
+#     results = list(executor.map(compute_features, itertools.repeat(store), store.tickers()))
@@ -0,0 +1,123 @@
+# computation_cache.py
+
+import hashlib
+import threading
+from collections import OrderedDict
+import pandas as pd
+import ta
+from App.Logger import System_Log
+
+# Setup the logger
+system_logger = System_Log.setup_logger('computation_cache')
+
+class ComputationCache:
+    def __init__(self, max_entries=128):
+        """
+        Memoize indicator primitives keyed on (input fingerprints, name, params).
+        Entries are evicted least-recently-used once max_entries is reached. Lookups, inserts
+        and evictions hold a lock, so one cache can be shared by threads.
+        """
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def fingerprint(series):
+        """Content hash of a Series (values and index), so equal inputs share entries."""
+        hashed = pd.util.hash_pandas_object(series, index=True).to_numpy()
+        return hashlib.blake2b(hashed.tobytes(), digest_size=16).hexdigest()
+
+    @staticmethod
+    def _copy(value):
+        if isinstance(value, tuple):
+            return tuple(item.copy() for item in value)
+        return value.copy()
+
+    def get_or_compute(self, name, inputs, params, compute):
+        """
+        Return the cached result of name(inputs, **params), calling compute() on a miss.
+        inputs is a tuple of Series; results (a Series/array or a tuple of them) are returned
+        as copies so callers can modify them without corrupting the cache.
+        """
+        try:
+            key = (tuple(self.fingerprint(series) for series in inputs), name, tuple(sorted(params.items())))
+            with self.lock:
+                value = self.entries.get(key)
+                if value is not None:
+                    self.hits += 1
+                    self.entries.move_to_end(key)
+                    return self._copy(value)
+                self.misses += 1
+            # Computed outside the lock so other threads are not held up; a concurrent miss on the
+            # same key computes it twice and keeps one result
+            value = compute()
+            with self.lock:
+                self.entries[key] = value
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+            return self._copy(value)
+        except Exception as e:
+            system_logger.error(f"Error computing cached {name}: {e}")
+            raise
+
+    def stats(self):
+        """Hit/miss counters and current number of entries."""
+        with self.lock:
+            hits, misses, entries = self.hits, self.misses, len(self.entries)
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'entries': entries,
+            'hit_rate': hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self, reset_stats=True):
+        """Drop all entries and, unless reset_stats is False, the hit/miss counters."""
+        with self.lock:
+            self.entries.clear()
+            if reset_stats:
+                self.hits = 0
+                self.misses = 0
+
+    # Primitives shared by several indicators and patterns. Callers holding an equivalent
+    # implementation (e.g. IndicatorEngine's NumPy version) may pass it as compute.
+    def rsi(self, close, window=14, compute=None):
+        """Relative Strength Index, as ta.momentum.RSIIndicator."""
+        compute = compute or (lambda: ta.momentum.RSIIndicator(close, window=window).rsi())
+        return self.get_or_compute('rsi', (close,), {'window': window}, compute)
+
+    def stochastic(self, high, low, close, window=14, smooth_window=3, compute=None):
+        """Stochastic Oscillator as (k, d), as ta.momentum.StochasticOscillator."""
+        def stochastic():
+            stoch = ta.momentum.StochasticOscillator(high, low, close, window=window, smooth_window=smooth_window)
+            return stoch.stoch(), stoch.stoch_signal()
+        params = {'window': window, 'smooth_window': smooth_window}
+        return self.get_or_compute('stochastic', (high, low, close), params, compute or stochastic)
+
+    def bollinger_bands(self, close, window=20, std_dev=2, compute=None):
+        """Bollinger Bands as (high, mid, low), as ta.volatility.BollingerBands."""
+        def bollinger_bands():
+            bb = ta.volatility.BollingerBands(close, window=window, window_dev=std_dev)
+            return bb.bollinger_hband(), bb.bollinger_mavg(), bb.bollinger_lband()
+        params = {'window': window, 'std_dev': std_dev}
+        return self.get_or_compute('bollinger_bands', (close,), params, compute or bollinger_bands)
+
+    def rolling_max(self, series, window):
+        """Rolling maximum over full windows."""
+        return self.get_or_compute('rolling_max', (series,), {'window': window}, lambda: series.rolling(window).max())
+
+    def rolling_min(self, series, window):
+        """Rolling minimum over full windows."""
+        return self.get_or_compute('rolling_min', (series,), {'window': window}, lambda: series.rolling(window).min())
+
+
+# Cache shared by Patterns, Indicators and IndicatorEngine within a feature engineering run
+shared_cache = ComputationCache()
+
+# Example usage:
+# rsi = shared_cache.rsi(data['Close'], window=14)  # computed once, later calls are hits
+# print(shared_cache.stats())
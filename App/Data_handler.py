@@ -1,28 +1,98 @@
 # data_handler.py
 
+import os
+import time
+import threading
+import numpy as np
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import yfinance as yf
 import alpaca_trade_api as tradeapi
 from Logger import System_Log
-from Config.Config import Alpaca_API_KEY, Alpaca_SECRET_KEY
+from Bar_cache import BarCache
+from Config.Config import Alpaca_API_KEY, Alpaca_SECRET_KEY, BAR_CACHE_DIR, YFINANCE_REQUESTS_PER_SECOND, ALPACA_REQUESTS_PER_SECOND
 
 # Setup the logger
 system_logger = System_Log.setup_logger('data_handler')
 
 class DataHandler:
+    # Compact dtypes used when streaming large CSV exports
+    COMPACT_DTYPES = {
+        'Open': 'float32',
+        'High': 'float32',
+        'Low': 'float32',
+        'Close': 'float32',
+        'Adj Close': 'float32',
+        'Volume': 'uint64',
+    }
+
+    # Alpaca timeframe names accepted by load_from_alpaca
+    ALPACA_TIMEFRAMES = {
+        'minute': '1Min',
+        'hour': '1Hour',
+        'day': '1Day',
+        'week': '1Week',
+        'month': '1Month',
+    }
+    ALPACA_COLUMNS = {
+        'Date': 'datetime64[ns]',
+        'Open': 'float64',
+        'High': 'float64',
+        'Low': 'float64',
+        'Close': 'float64',
+        'Volume': 'float64',
+    }
+
     @staticmethod
-    def load_from_csv(file_path):
+    def load_from_csv(file_path, chunksize=None, usecols=None, dtype=None, callback=None):
         """
         Load historical data from a CSV file.
+        With chunksize set, the file is streamed with compact dtypes (see stream_from_csv):
+        each chunk is passed to callback if given (and the row count returned), otherwise
+        the compact chunks are concatenated into a single frame. Either way Date is a column,
+        as in the non-chunked schema.
         """
         try:
-            data = pd.read_csv(file_path, parse_dates=['Date'])
-            system_logger.info(f"Data loaded successfully from {file_path}")
+            if chunksize is None:
+                data = pd.read_csv(file_path, parse_dates=['Date'], usecols=usecols, dtype=dtype)
+                system_logger.info(f"Data loaded successfully from {file_path}")
+                return data
+
+            chunks = DataHandler.stream_from_csv(file_path, chunksize=chunksize, usecols=usecols, dtype=dtype)
+            if callback is not None:
+                rows = 0
+                for chunk in chunks:
+                    callback(chunk)
+                    rows += len(chunk)
+                system_logger.info(f"Streamed {rows} rows from {file_path}")
+                return rows
+
+            data = pd.concat(chunks, ignore_index=True)
+            system_logger.info(f"Data loaded successfully from {file_path} ({len(data)} rows, compact dtypes)")
             return data
         except Exception as e:
             system_logger.error(f"Error loading data from CSV: {e}")
             raise
 
+    @staticmethod
+    def stream_from_csv(file_path, chunksize=100_000, usecols=None, dtype=None):
+        """
+        Stream a CSV file as chunks of at most chunksize rows, with Date kept as a column.
+        Only OHLCV columns are read unless usecols is given; prices are parsed as float32 and
+        volume as uint64 unless overridden by dtype. Peak memory is bounded by chunksize.
+        """
+        try:
+            if usecols is None:
+                usecols = lambda column: column == 'Date' or column in DataHandler.COMPACT_DTYPES
+            dtypes = {**DataHandler.COMPACT_DTYPES, **(dtype or {})}
+            reader = pd.read_csv(file_path, usecols=usecols, dtype=dtypes, parse_dates=['Date'], chunksize=chunksize)
+            with reader:
+                for chunk in reader:
+                    yield chunk
+        except Exception as e:
+            system_logger.error(f"Error streaming data from CSV: {e}")
+            raise
+
     @staticmethod
     def load_from_yfinance(ticker, start_date, end_date):
         """
@@ -52,45 +122,266 @@ class DataHandler:
             raise
 
     @staticmethod
-    def load_from_alpaca(ticker, start_date, end_date, api_key, api_secret, base_url):
+    def load_from_alpaca(ticker, start_date, end_date, api_key, api_secret, base_url, timeframe='day',
+                         page_limit=10000, sink=None, api=None):
         """
         Load historical data from Alpaca API.
+        Bars are requested page by page from the v2 market data endpoint and copied into
+        preallocated NumPy column buffers that double in size when full. timeframe is one of
+        ALPACA_TIMEFRAMES or an Alpaca timeframe string such as '5Min'. If sink is given, each
+        page is handed to it as a DataFrame instead (e.g. BarCache.page_sink), keeping memory
+        bounded by page_limit, and the number of bars is returned. api may be any object
+        exposing the REST data_get method, such as a local stub.
         """
         try:
-            api = tradeapi.REST(api_key, api_secret, base_url, api_version='v2')
-            barset = api.get_barset(ticker, 'day', start=start_date, end=end_date)
-            bars = barset[ticker]
-            
-            data = pd.DataFrame({
-                'Date': [bar.t for bar in bars],
-                'Open': [bar.o for bar in bars],
-                'High': [bar.h for bar in bars],
-                'Low': [bar.l for bar in bars],
-                'Close': [bar.c for bar in bars],
-                'Volume': [bar.v for bar in bars]
-            })
-            data['Date'] = pd.to_datetime(data['Date'])  # Ensure correct datetime format
-            
-            system_logger.info(f"Data loaded successfully from Alpaca API for {ticker} from {start_date} to {end_date}")
-            return data
+            if api is None:
+                api = tradeapi.REST(api_key, api_secret, base_url, api_version='v2')
+            params = {
+                'timeframe': DataHandler.ALPACA_TIMEFRAMES.get(timeframe, timeframe),
+                'start': pd.Timestamp(start_date).isoformat(),
+                'end': pd.Timestamp(end_date).isoformat(),
+                'limit': page_limit,
+                'adjustment': 'raw',
+            }
+
+            buffers = {column: np.empty(page_limit, dtype=dtype) for column, dtype in DataHandler.ALPACA_COLUMNS.items()}
+            size = 0
+            pages = 0
+            while True:
+                response = api.data_get(f'/stocks/{ticker}/bars', data=params, api_version='v2')
+                page = DataHandler._alpaca_page_columns(response.get('bars') or [])
+                count = len(page['Date'])
+                pages += 1
+
+                if sink is not None:
+                    if count:
+                        sink(DataHandler._alpaca_frame(page))
+                else:
+                    if size + count > len(buffers['Date']):
+                        capacity = max(2 * len(buffers['Date']), size + count)
+                        for column, buffer in buffers.items():
+                            grown = np.empty(capacity, dtype=buffer.dtype)
+                            grown[:size] = buffer[:size]
+                            buffers[column] = grown
+                    for column, values in page.items():
+                        buffers[column][size:size + count] = values
+                size += count
+
+                params['page_token'] = response.get('next_page_token')
+                if not params['page_token']:
+                    break
+
+            system_logger.info(f"Data loaded successfully from Alpaca API for {ticker} from {start_date} to {end_date} ({size} {timeframe} bars, {pages} pages)")
+            if sink is not None:
+                return size
+            if size == 0:
+                raise ValueError("No data received from Alpaca API. Check API requests.")
+            return DataHandler._alpaca_frame({column: buffer[:size] for column, buffer in buffers.items()})
         except Exception as e:
             system_logger.error(f"Error loading data from Alpaca API: {e}")
             raise
-    
+
+    @staticmethod
+    def _alpaca_page_columns(bars):
+        count = len(bars)
+        page = {'Date': pd.to_datetime([bar['t'] for bar in bars], utc=True).tz_localize(None).to_numpy(dtype='datetime64[ns]')}
+        for column, key in (('Open', 'o'), ('High', 'h'), ('Low', 'l'), ('Close', 'c'), ('Volume', 'v')):
+            page[column] = np.fromiter((bar[key] for bar in bars), dtype=DataHandler.ALPACA_COLUMNS[column], count=count)
+        return page
+
     @staticmethod
-    def run(ticker, start_date, end_date, data_source='yfinance', api_key=None, api_secret=None, base_url=None):
+    def _alpaca_frame(columns):
+        data = pd.DataFrame(columns)
+        data['Date'] = data['Date'].dt.tz_localize('UTC')
+        return data
+
+    @staticmethod
+    def get_source(data_source, api_key=None, api_secret=None, base_url=None):
+        """
+        Return the DataSource for a source name; DataSource instances are passed through.
+        """
+        if isinstance(data_source, DataSource):
+            return data_source
+        if data_source == 'yfinance':
+            return YFinanceSource()
+        elif data_source == 'alpaca':
+            if not all([api_key, api_secret, base_url]):
+                raise ValueError("Missing Alpaca API credentials.")
+            return AlpacaSource(api_key, api_secret, base_url)
+        else:
+            raise ValueError("Invalid data source. Choose 'yfinance' or 'alpaca'.")
+
+    @staticmethod
+    def fetch(source, ticker, start_date, end_date, max_retries=0, backoff=1.0):
+        """
+        Fetch bars from a source, honouring its rate limit and retrying transient
+        failures with exponential backoff. Empty responses (ValueError), which sources such
+        as yfinance also return on throttling or network hiccups, are retried the same way
+        and re-raised once max_retries is exhausted.
+        """
+        attempt = 0
+        while True:
+            source.rate_limiter.wait()
+            try:
+                return source.fetch(ticker, start_date, end_date)
+            except Exception as e:
+                if attempt >= max_retries:
+                    raise
+                delay = backoff * (2 ** attempt)
+                attempt += 1
+                system_logger.warning(f"Fetch of {ticker} from {source.name} failed ({e}); retry {attempt}/{max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+
+    @staticmethod
+    def run(ticker, start_date, end_date, data_source='yfinance', api_key=None, api_secret=None, base_url=None,
+            use_cache=True, cache_dir=BAR_CACHE_DIR, max_retries=0, backoff=1.0):
         """
         Run the data handler to fetch data from the selected source.
+        When use_cache is set, bars already stored in the local cache are reused and only
+        the missing date ranges are fetched from the source.
         """
         try:
-            if data_source == 'yfinance':
-                return DataHandler.load_from_yfinance(ticker, start_date, end_date)
-            elif data_source == 'alpaca':
-                if not all([api_key, api_secret, base_url]):
-                    raise ValueError("Missing Alpaca API credentials.")
-                return DataHandler.load_from_alpaca(ticker, start_date, end_date, api_key, api_secret, base_url)
-            else:
-                raise ValueError("Invalid data source. Choose 'yfinance' or 'alpaca'.")
+            source = DataHandler.get_source(data_source, api_key, api_secret, base_url)
+            fetch = lambda start, end: DataHandler.fetch(source, ticker, start, end, max_retries, backoff)
+
+            if not use_cache:
+                return fetch(start_date, end_date)
+            return DataHandler.load_cached(ticker, start_date, end_date, source.name, fetch, BarCache(cache_dir))
         except Exception as e:
             system_logger.error(f"Error running data handler: {e}")
             raise
+
+    @staticmethod
+    def run_many(tickers, start_date, end_date, data_source='yfinance', api_key=None, api_secret=None, base_url=None,
+                 use_cache=False, cache_dir=BAR_CACHE_DIR, max_workers=8, max_retries=3, backoff=1.0):
+        """
+        Fetch several tickers concurrently through a bounded thread pool.
+        Yields (ticker, data) pairs as each ticker completes; tickers that still fail
+        after retrying are logged and skipped. Set use_cache to serve bars through the
+        local BarCache. tickers may be any iterable, including a generator.
+        """
+        tickers = list(tickers)
+        source = DataHandler.get_source(data_source, api_key, api_secret, base_url)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(DataHandler.run, ticker, start_date, end_date, source,
+                                use_cache=use_cache, cache_dir=cache_dir, max_retries=max_retries, backoff=backoff): ticker
+                for ticker in tickers
+            }
+            for future in as_completed(futures):
+                ticker = futures[future]
+                try:
+                    data = future.result()
+                except Exception as e:
+                    system_logger.error(f"Skipping {ticker}: {e}")
+                    continue
+                yield ticker, data
+        system_logger.info(f"Batch load of {len(tickers)} tickers from {source.name} completed.")
+
+    @staticmethod
+    def load_cached(ticker, start_date, end_date, data_source, fetch, cache):
+        """
+        Serve a date range from the bar cache, fetching and merging only the missing ranges.
+        Ranges without a business day are not requested. A range that still comes back empty
+        (ValueError, after fetch's retries) is skipped without recording any coverage, so it is
+        requested again on the next call rather than cached as a permanent gap; other fetch
+        errors propagate.
+        """
+        try:
+            for gap_start, gap_end in cache.missing_ranges(data_source, ticker, start_date, end_date):
+                gap_start, gap_end = gap_start.strftime('%Y-%m-%d'), gap_end.strftime('%Y-%m-%d')
+                if gap_start == gap_end or not np.busday_count(gap_start, gap_end):
+                    continue
+                try:
+                    fetched = fetch(gap_start, gap_end)
+                except ValueError as e:
+                    system_logger.warning(f"No bars for {ticker} from {gap_start} to {gap_end} ({e}); range left uncached")
+                    continue
+                cache.merge(data_source, ticker, fetched, gap_start, gap_end)
+
+            data = cache.load(data_source, ticker, start_date, end_date)
+            if data.empty:
+                raise ValueError(f"No data available for {ticker} from {start_date} to {end_date}.")
+            return data
+        except Exception as e:
+            system_logger.error(f"Error loading cached data for {ticker}: {e}")
+            raise
+
+
+class RateLimiter:
+    def __init__(self, requests_per_second=None):
+        """Allow at most requests_per_second calls across all threads (None disables limiting)."""
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        """Block until the next request slot is available."""
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+# Base class to define the common source interface
+class DataSource:
+    name = None
+
+    def __init__(self, requests_per_second=None):
+        self.rate_limiter = RateLimiter(requests_per_second)
+
+    def fetch(self, ticker, start_date, end_date):
+        """Return OHLCV bars for ticker within [start_date, end_date) in the DataHandler schema."""
+        raise NotImplementedError("Subclasses must implement this method.")
+
+
+class YFinanceSource(DataSource):
+    name = 'yfinance'
+
+    def __init__(self, requests_per_second=YFINANCE_REQUESTS_PER_SECOND):
+        super().__init__(requests_per_second)
+
+    def fetch(self, ticker, start_date, end_date):
+        return DataHandler.load_from_yfinance(ticker, start_date, end_date)
+
+
+class AlpacaSource(DataSource):
+    name = 'alpaca'
+
+    def __init__(self, api_key, api_secret, base_url, timeframe='day', requests_per_second=ALPACA_REQUESTS_PER_SECOND):
+        super().__init__(requests_per_second)
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.base_url = base_url
+        self.timeframe = timeframe
+        if timeframe != 'day':
+            # Keep cached partitions of different bar sizes apart
+            self.name = f"alpaca_{timeframe}"
+
+    def fetch(self, ticker, start_date, end_date):
+        return DataHandler.load_from_alpaca(ticker, start_date, end_date, self.api_key, self.api_secret, self.base_url,
+                                            timeframe=self.timeframe)
+
+
+class CSVSource(DataSource):
+    name = 'csv'
+
+    def __init__(self, directory, requests_per_second=None):
+        """Serve bars from local '<ticker>.csv' files, e.g. for offline runs and testing."""
+        super().__init__(requests_per_second)
+        self.directory = directory
+
+    def fetch(self, ticker, start_date, end_date):
+        data = DataHandler.load_from_csv(os.path.join(self.directory, f"{ticker}.csv"))
+        data = data[(data['Date'] >= pd.Timestamp(start_date)) & (data['Date'] < pd.Timestamp(end_date))]
+        if data.empty:
+            raise ValueError(f"No data for {ticker} between {start_date} and {end_date} in {self.directory}.")
+        return data.reset_index(drop=True)
+
+# Example usage:
+# for ticker, data in DataHandler.run_many(['AAPL', 'MSFT', 'GOOG'], '2022-01-01', '2022-12-31', max_workers=4):
+#     print(ticker, len(data))
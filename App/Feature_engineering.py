@@ -1,22 +1,97 @@
 # feature_engineering.py
 
+import re
 import pandas as pd
 import numpy as np
 from sklearn.preprocessing import MinMaxScaler
+import joblib
 from Patterns import Patterns
 from Indicators import Indicators
+from Indicator_engine import IndicatorEngine
+from Pattern_engine import PatternEngine
+from Pattern_flags import PatternFlags, PATTERN_BITS, PATTERN_HELPERS, FLAG_COLUMN
+from App.Computation_cache import shared_cache
 from Logger import System_Log
+from Config.Config import FEATURE_DTYPE
 
 # Setup the logger
 system_logger = System_Log.setup_logger('feature_engineering')
 
+# Bump whenever a change alters engineered values, so stored features are recomputed
+PIPELINE_VERSION = 1
+
+BASE_COLUMNS = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']
+
+# Feature column -> PatternEngine pattern whose evaluation produces it
+PATTERN_FEATURES = dict({name: name for name in PATTERN_BITS}, **{
+    'high_max': 'higher_highs', 'low_min': 'lower_lows', 'cup': 'cup_and_handle', 'handle': 'cup_and_handle',
+    'price_diff': 'rsi_divergence', 'rsi_diff': 'rsi_divergence', 'bb_squeeze': 'bollinger_band_squeeze',
+    'short_ma': 'ma_crossover', 'long_ma': 'ma_crossover', 'adx': 'strong_trend',
+    'stoch_k': 'stoch_overbought', 'stoch_d': 'stoch_overbought', 'high_trend': 'wedge', 'low_trend': 'wedge',
+})
+
+# Feature column -> Indicators method that produces it (default parameters, as add_indicators)
+INDICATOR_FEATURES = {
+    'MA_20': 'moving_average', 'EMA_20': 'exponential_moving_average', 'RSI': 'relative_strength_index',
+    'BB_High': 'bollinger_bands', 'BB_Low': 'bollinger_bands', 'BB_Mid': 'bollinger_bands',
+    'MACD': 'macd', 'MACD_Signal': 'macd', 'MACD_Hist': 'macd', 'ATR': 'average_true_range',
+    'Stoch_K': 'stochastic_oscillator', 'Stoch_D': 'stochastic_oscillator', 'CCI': 'commodity_channel_index',
+    'Ichimoku_Conversion': 'ichimoku_cloud', 'Ichimoku_Base': 'ichimoku_cloud',
+    'Ichimoku_LeadingA': 'ichimoku_cloud', 'Ichimoku_LeadingB': 'ichimoku_cloud',
+    'Aroon_Up': 'aroon', 'Aroon_Down': 'aroon', 'Parabolic_SAR': 'parabolic_sar',
+    'VWAP': 'volume_weighted_average_price', 'OBV': 'on_balance_volume', 'MFI': 'money_flow_index',
+    'CMF': 'chaikin_money_flow', 'EOM': 'ease_of_movement', 'ADI': 'accumulation_distribution',
+    'Ultimate_Oscillator': 'ultimate_oscillator',
+}
+
+LAG_SUFFIX = re.compile(r'^(?P<column>.+)_lag(?P<lag>[1-9][0-9]*)$')
+
 class FeatureEngineering:
     @staticmethod
-    def add_patterns(data):
+    def compact_features(data, columns, dtype):
+        """
+        Store the given feature columns compactly: floating-point columns as dtype and
+        boolean pattern flags as uint8.
+        """
+        try:
+            for column in columns:
+                if data[column].dtype == bool:
+                    data[column] = data[column].astype(np.uint8)
+                elif data[column].dtype.kind == 'f' and data[column].dtype != dtype:
+                    data[column] = data[column].astype(dtype)
+            return data
+        except Exception as e:
+            system_logger.error(f"Error compacting features: {e}")
+            raise
+
+    @staticmethod
+    def add_patterns(data, fused=True, dtype=None, packed=False):
         """
         Add patterns as features to the data.
+        By default all patterns are evaluated in a single pass by PatternEngine and attached
+        as one block; fused=False calls each Patterns method in turn.
+        With dtype (e.g. np.float32) the pattern columns are compacted: values as dtype, flags as uint8.
+        With packed=True the pattern flags are replaced by a single uint32 bitmask column
+        (see Pattern_flags) and the redundant helper columns are dropped. engineer_features
+        passes that column through unlagged and unscaled; unpack it before using its bits.
+        A FLAG_COLUMN already in data is recomputed, or dropped when packed is False, so the
+        flags are never held twice.
         """
         try:
+            if not packed and FLAG_COLUMN in data.columns:
+                data = data.drop(columns=FLAG_COLUMN)
+            if fused:
+                block = PatternEngine.compute(data, dtype=dtype)
+                existing = [col for col in block.columns if col in data.columns]
+                if existing:
+                    data[existing] = block[existing]
+                data = pd.concat([data, block.drop(columns=existing)], axis=1)
+                if packed:
+                    data = FeatureEngineering.pack_patterns(data)
+                system_logger.info("Patterns added successfully.")
+                return data
+
+            columns = set(data.columns)
             data = Patterns.higher_highs_lower_lows(data)
             data = Patterns.double_top(data)
             data = Patterns.head_and_shoulders(data)
@@ -37,6 +112,10 @@ class FeatureEngineering:
             data = Patterns.flag(data)
             data = Patterns.wedge(data)
             data = Patterns.triangle(data)
+            if dtype is not None:
+                data = FeatureEngineering.compact_features(data, [col for col in data.columns if col not in columns], dtype)
+            if packed:
+                data = FeatureEngineering.pack_patterns(data)
             system_logger.info("Patterns added successfully.")
             return data
         except Exception as e:
@@ -44,11 +123,40 @@ class FeatureEngineering:
             raise
 
     @staticmethod
-    def add_indicators(data):
+    def pack_patterns(data):
+        """
+        Replace the pattern flag columns of data with the packed FLAG_COLUMN bitmask and drop
+        the helper columns that only restate other pattern columns.
+        """
+        try:
+            flags = [name for name in PATTERN_BITS if name in data.columns]
+            data[FLAG_COLUMN] = PatternFlags.pack(data, flags)
+            data = data.drop(columns=flags + [col for col in PATTERN_HELPERS if col in data.columns])
+            system_logger.info(f"Packed {len(flags)} pattern flags into '{FLAG_COLUMN}'.")
+            return data
+        except Exception as e:
+            system_logger.error(f"Error packing patterns: {e}")
+            raise
+
+    @staticmethod
+    def add_indicators(data, fused=True, dtype=None):
         """
         Add indicators as features to the data.
+        By default all indicators are computed in a single pass by IndicatorEngine and
+        attached as one block; fused=False calls each Indicators method in turn.
+        With dtype (e.g. np.float32) the indicator columns are stored in that precision.
         """
         try:
+            if fused:
+                block = IndicatorEngine.compute(data, dtype=dtype)
+                existing = [col for col in block.columns if col in data.columns]
+                if existing:
+                    data[existing] = block[existing]
+                data = pd.concat([data, block.drop(columns=existing)], axis=1)
+                system_logger.info("Indicators added successfully.")
+                return data
+
+            columns = set(data.columns)
             data = Indicators.moving_average(data)
             data = Indicators.exponential_moving_average(data)
             data = Indicators.relative_strength_index(data)
@@ -67,6 +175,8 @@ class FeatureEngineering:
             data = Indicators.ease_of_movement(data)
             data = Indicators.accumulation_distribution(data)
             data = Indicators.ultimate_oscillator(data)
+            if dtype is not None:
+                data = FeatureEngineering.compact_features(data, [col for col in data.columns if col not in columns], dtype)
             system_logger.info("Indicators added successfully.")
             return data
         except Exception as e:
@@ -88,28 +198,105 @@ class FeatureEngineering:
             raise
 
     @staticmethod
-    def normalise_data(data, columns):
+    def normalise_data(data, columns, scaler=None, partial_fit=False):
         """
         Normalise specified columns in the data.
+        Without scaler a fresh MinMaxScaler is fitted on all rows. A scaler passed in (e.g. a
+        MinMaxScaler or StandardScaler, or one from load_scaler) is fitted on these rows the
+        first time and afterwards only applied, so scaled values of old rows stay stable and
+        inference reuses the training window's ranges. partial_fit=True first folds these rows
+        into its running statistics (min/max, mean/var) instead of refitting on the history.
         """
         try:
-            scaler = MinMaxScaler()
-            data[columns] = scaler.fit_transform(data[columns])
+            if scaler is None:
+                scaler = MinMaxScaler()
+                data[columns] = scaler.fit_transform(data[columns])
+            else:
+                if partial_fit or not hasattr(scaler, 'n_features_in_'):
+                    scaler.partial_fit(data[columns])
+                data[columns] = scaler.transform(data[columns])
             system_logger.info("Data normalised successfully.")
             return data
         except Exception as e:
             system_logger.error(f"Error normalising data: {e}")
             raise
 
+    @staticmethod
+    def save_scaler(scaler, file_path):
+        """
+        Save a fitted scaler to a file.
+        """
+        try:
+            joblib.dump(scaler, file_path)
+            system_logger.info(f"Scaler saved successfully to {file_path}")
+        except Exception as e:
+            system_logger.error(f"Error saving scaler: {e}")
+            raise
+
+    @staticmethod
+    def load_scaler(file_path):
+        """
+        Load a fitted scaler from a file.
+        """
+        try:
+            scaler = joblib.load(file_path)
+            system_logger.info(f"Scaler loaded successfully from {file_path}")
+            return scaler
+        except Exception as e:
+            system_logger.error(f"Error loading scaler: {e}")
+            raise
+
     @staticmethod
     def create_lagged_features(data, columns, lags=1):
         """
         Create lagged features for the specified columns.
+        lags is the number of lags (1..lags) or an iterable of the lags to create; negative
+        lags are leads, as pandas shift (e.g. -1 gives '<column>_lag-1', the next bar's value).
+        Lags of uint8 pattern flags are filled with 0 so they stay uint8; other columns keep their dtype.
+        Lags of columns sharing a float or uint8 dtype are written into one preallocated 2-D
+        block, and all lag columns are attached with a single concat.
         """
         try:
+            lags = list(range(1, lags + 1) if isinstance(lags, int) else lags)
+            names = [f'{column}_lag{lag}' for column in columns for lag in lags]
+            groups, others = {}, []
             for column in columns:
-                for lag in range(1, lags + 1):
-                    data[f'{column}_lag{lag}'] = data[column].shift(lag)
+                dtype = data[column].dtype
+                if dtype.kind == 'f' or dtype == np.uint8:
+                    groups.setdefault(dtype, []).append(column)
+                else:
+                    others.append(column)
+
+            blocks = []
+            length = len(data)
+            for dtype, group in groups.items():
+                values = data[group].to_numpy(dtype=dtype)
+                lagged = np.empty((length, len(group), len(lags)), dtype=dtype)
+                fill_value = 0 if dtype == np.uint8 else np.nan
+                for i, lag in enumerate(lags):
+                    if lag >= 0:
+                        lag = min(lag, length)
+                        lagged[:lag, :, i] = fill_value
+                        lagged[lag:, :, i] = values[:length - lag]
+                    else:
+                        # Negative lags are leads, as shift(-n): later values moved up, tail filled
+                        lead = min(-lag, length)
+                        lagged[:length - lead, :, i] = values[lead:]
+                        lagged[length - lead:, :, i] = fill_value
+                group_names = [f'{column}_lag{lag}' for column in group for lag in lags]
+                blocks.append(pd.DataFrame(lagged.reshape(length, -1), index=data.index, columns=group_names, copy=False))
+            if others:
+                # Booleans and integers keep pandas' shift semantics (NaN-holding object/float lags)
+                blocks.append(pd.DataFrame({f'{column}_lag{lag}': data[column].shift(lag) for column in others for lag in lags}))
+
+            if blocks:
+                block = pd.concat(blocks, axis=1) if len(blocks) > 1 else blocks[0]
+                if list(block.columns) != names:
+                    block = block[names]
+                existing = [name for name in names if name in data.columns]
+                if existing:
+                    data[existing] = block[existing]
+                data = pd.concat([data, block.drop(columns=existing)], axis=1)
             system_logger.info("Lagged features created successfully.")
             return data
         except Exception as e:
@@ -117,29 +304,143 @@ class FeatureEngineering:
             raise
 
     @staticmethod
-    def engineer_features(data):
+    def resolve_features(features):
+        """
+        Resolve requested feature columns into the work needed to produce them.
+        Features are pattern or indicator columns, OHLCV columns, or lags of either written
+        as '<column>_lag<n>'. Returns (columns, patterns, methods, lags): the base columns to
+        keep, the PatternEngine patterns and Indicators methods to run, and {column: [lags]}.
+        """
+        columns, patterns, methods, lags = [], [], [], {}
+        for feature in features:
+            match = LAG_SUFFIX.match(feature)
+            column = match.group('column') if match else feature
+            if column in INDICATOR_FEATURES:
+                if INDICATOR_FEATURES[column] not in methods:
+                    methods.append(INDICATOR_FEATURES[column])
+            elif column in PATTERN_FEATURES:
+                if PATTERN_FEATURES[column] not in patterns:
+                    patterns.append(PATTERN_FEATURES[column])
+            elif column not in BASE_COLUMNS:
+                raise ValueError(f"Unknown feature: {feature}")
+            if column not in columns:
+                columns.append(column)
+            if match:
+                lags.setdefault(column, []).append(int(match.group('lag')))
+        return columns, patterns, methods, lags
+
+    @staticmethod
+    def add_features(data, columns, dtype=None):
+        """
+        Add only the given pattern and indicator columns to the data, running just the
+        PatternEngine predicates and Indicators methods that produce them.
+        """
+        try:
+            columns, patterns, methods, _ = FeatureEngineering.resolve_features(columns)
+            added = set(data.columns)
+            if patterns:
+                block = PatternEngine.compute(data, dtype=dtype, patterns=patterns)
+                wanted = [col for col in columns if col in PATTERN_FEATURES and col not in INDICATOR_FEATURES]
+                data = pd.concat([data.drop(columns=[col for col in wanted if col in data.columns]), block[wanted]], axis=1)
+            for method in methods:
+                data = getattr(Indicators, method)(data)
+            extra = [col for col in data.columns if col not in added and col not in columns]
+            data = data.drop(columns=extra)
+            if dtype is not None:
+                data = FeatureEngineering.compact_features(data, [col for col in data.columns if col not in added], dtype)
+            system_logger.info(f"Added {len(columns)} features from {len(patterns)} patterns and {len(methods)} indicators.")
+            return data
+        except Exception as e:
+            system_logger.error(f"Error adding features: {e}")
+            raise
+
+    @staticmethod
+    def engineer_features(data, dtype=FEATURE_DTYPE, features=None, normalise=True, scaler=None, packed=False):
         """
         Perform complete feature engineering on the data.
+        dtype sets the precision of the engineered features (None keeps float64); with
+        np.float32 every feature stays float32 and pattern flags stay uint8 throughout.
+        Primitives shared by patterns and indicators (RSI, stochastic, Bollinger Bands,
+        rolling extremes) are computed once per run through the shared computation cache.
+        With features (e.g. SignalGenerator.REQUIRED_FEATURES) only those columns and the
+        lags named in it ('RSI_lag1') are computed, normalised and returned alongside OHLCV.
+        normalise=False leaves features on their raw scale, so rows do not depend on the
+        rest of the history (as FeatureStore needs for incremental appends). scaler is passed
+        to normalise_data: fitted here on a training window, then reused at inference.
+        packed=True stores the pattern flags as the one uint32 FLAG_COLUMN bitmask instead of
+        a column per pattern (see add_patterns); the bitmask is neither lagged nor scaled, so
+        a packed frame carries no lags of the flags.
         """
         try:
-            data = FeatureEngineering.add_patterns(data)
-            data = FeatureEngineering.add_indicators(data)
+            shared_cache.clear()
+            if features is not None:
+                return FeatureEngineering._engineer_selected_features(data, dtype, features, normalise, scaler, packed)
+            data = FeatureEngineering.add_patterns(data, dtype=dtype, packed=packed)
+            data = FeatureEngineering.add_indicators(data, dtype=dtype)
             data = FeatureEngineering.handle_missing_values(data)
 
-            feature_columns = [col for col in data.columns if col not in ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']]
+            # A packed FLAG_COLUMN is a bitmask, not a magnitude: it is neither lagged nor scaled
+            feature_columns = [col for col in data.columns if col not in ['Date', 'Open', 'High', 'Low', 'Close', 'Volume', FLAG_COLUMN]]
             data = FeatureEngineering.create_lagged_features(data, feature_columns, lags=3)
-            data = FeatureEngineering.normalise_data(data, feature_columns)
+            if dtype is not None:
+                # uint8 flags are already 0/1, so only the continuous features are scaled
+                feature_columns = [col for col in feature_columns if data[col].dtype != np.uint8]
+            if normalise:
+                data = FeatureEngineering.normalise_data(data, feature_columns, scaler)
 
             # Drop rows with NaN values created by lagging
             data.dropna(inplace=True)
 
+            stats = shared_cache.stats()
+            system_logger.info(f"Computation cache: {stats['hits']} hits, {stats['misses']} misses.")
+            # Release the cached series but keep the counters for inspection
+            shared_cache.clear(reset_stats=False)
             system_logger.info("Feature engineering completed successfully.")
             return data
         except Exception as e:
             system_logger.error(f"Error in feature engineering: {e}")
             raise
 
+    @staticmethod
+    def _engineer_selected_features(data, dtype, features, normalise=True, scaler=None, packed=False):
+        """
+        engineer_features restricted to the requested features; see resolve_features. With
+        packed the requested pattern flags (not their lags) are packed into FLAG_COLUMN.
+        """
+        columns, _, _, lags = FeatureEngineering.resolve_features(features)
+        data = FeatureEngineering.add_features(data, [col for col in columns if col not in BASE_COLUMNS], dtype)
+        data = FeatureEngineering.handle_missing_values(data)
+        for column, column_lags in lags.items():
+            data = FeatureEngineering.create_lagged_features(data, [column], lags=sorted(set(column_lags)))
+
+        feature_columns = [feature for feature in dict.fromkeys(features) if feature not in BASE_COLUMNS]
+        data = data[[col for col in BASE_COLUMNS if col in data.columns] + feature_columns].copy()
+        if packed:
+            flags = [col for col in feature_columns if col in PATTERN_BITS]
+            data[FLAG_COLUMN] = PatternFlags.pack(data, flags)
+            data = data.drop(columns=flags)
+            feature_columns = [col for col in feature_columns if col not in flags]
+        # As in the full pipeline, lags keep their raw scale and only base features are normalised
+        feature_columns = [col for col in feature_columns if not LAG_SUFFIX.match(col)]
+        if dtype is not None:
+            feature_columns = [col for col in feature_columns if data[col].dtype != np.uint8]
+        if normalise:
+            data = FeatureEngineering.normalise_data(data, feature_columns, scaler)
+        data.dropna(inplace=True)
+
+        shared_cache.clear(reset_stats=False)
+        system_logger.info(f"Feature engineering of {len(features)} requested features completed successfully.")
+        return data
+
 # Example usage:
 # data = pd.read_csv('path_to_your_csv')
 # data = FeatureEngineering.engineer_features(data)
+# compact = FeatureEngineering.engineer_features(data, dtype=np.float32)
+# packed = FeatureEngineering.add_patterns(data, packed=True)
+# packed_features = FeatureEngineering.engineer_features(data, packed=True)
+# lean = FeatureEngineering.engineer_features(data, features=SignalGenerator.REQUIRED_FEATURES)
+# scaler = MinMaxScaler()
+# train = FeatureEngineering.engineer_features(train_data, scaler=scaler)
+# FeatureEngineering.save_scaler(scaler, 'path_to_save_scaler')
+# live = FeatureEngineering.engineer_features(live_data, scaler=FeatureEngineering.load_scaler('path_to_save_scaler'))
 # print(data.head())
@@ -0,0 +1,220 @@
+# indicator_engine.py
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from Logger import System_Log
+from Kernels import ema, wilder, psar
+from App.Computation_cache import shared_cache
+
+# Setup the logger
+system_logger = System_Log.setup_logger('indicator_engine')
+
+# Window elements reduced per block, bounding the temporary memory used by sliding windows
+_WINDOW_BLOCK = 1 << 22
+
+
+# Helpers operate along axis 0, so they accept single series (bars,) and panels (bars, tickers)
+def _shift(values, periods=1):
+    shifted = np.full(np.shape(values), np.nan)
+    if periods < len(values):
+        shifted[periods:] = values[:len(values) - periods]
+    return shifted
+
+
+def _rolling_sum(values, window):
+    """Rolling sum over full windows; windows containing NaN give NaN (as pandas does)."""
+    values = np.asarray(values, dtype=float)
+    result = np.full(values.shape, np.nan)
+    if len(values) < window:
+        return result
+    missing = np.isnan(values)
+    sums = np.cumsum(np.where(missing, 0.0, values), axis=0)
+    counts = np.cumsum(missing, axis=0)
+    padding = np.zeros((1,) + values.shape[1:])
+    result[window - 1:] = sums[window - 1:] - np.concatenate([padding, sums[:-window]])
+    nan_counts = counts[window - 1:] - np.concatenate([padding, counts[:-window]])
+    result[window - 1:][nan_counts > 0] = np.nan
+    return result
+
+
+def _rolling_mean(values, window):
+    return _rolling_sum(values, window) / window
+
+
+def _rolling_reduce(values, window, reducer):
+    """Apply reducer(windows, axis=-1) over every full window, processed in bounded blocks."""
+    values = np.asarray(values, dtype=float)
+    result = np.full(values.shape, np.nan)
+    if len(values) < window:
+        return result
+    windows = sliding_window_view(values, window, axis=0)
+    rows = max(1, _WINDOW_BLOCK // (window * int(np.prod(values.shape[1:]))))
+    for start in range(0, len(windows), rows):
+        block = windows[start:start + rows]
+        result[window - 1 + start:window - 1 + start + len(block)] = reducer(block, axis=-1)
+    return result
+
+
+def _rolling_max(values, window):
+    return _rolling_reduce(values, window, np.max)
+
+
+def _rolling_min(values, window):
+    return _rolling_reduce(values, window, np.min)
+
+
+def _rolling_std(values, window):
+    # Population standard deviation (ddof=0), as used by ta's Bollinger Bands
+    return _rolling_reduce(values, window, np.std)
+
+
+def _rolling_mad(values, window):
+    def mad(block, axis):
+        return np.abs(block - block.mean(axis=axis, keepdims=True)).mean(axis=axis)
+    return _rolling_reduce(values, window, mad)
+
+
+def _divide(numerator, denominator):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return numerator / denominator
+
+
+# RSI, Bollinger Bands and the stochastic oscillator are shared with Patterns and PatternEngine
+# through the computation cache, so whichever runs first computes them for all
+def _cached_rsi(data, window=14):
+    def compute():
+        close = data['Close'].to_numpy(dtype=float)
+        close_diff = close - _shift(close)
+        up = np.where(close_diff > 0, close_diff, 0.0)
+        down = np.where(close_diff < 0, -close_diff, 0.0)
+        ema_up = ema(up, alpha=1.0 / window, min_periods=window)
+        ema_down = ema(down, alpha=1.0 / window, min_periods=window)
+        return pd.Series(np.where(ema_down == 0, 100.0, 100.0 - 100.0 / (1.0 + _divide(ema_up, ema_down))), index=data.index)
+    return shared_cache.rsi(data['Close'], window, compute=compute).to_numpy()
+
+
+def _cached_bollinger_bands(data, window=20, std_dev=2):
+    def compute():
+        close = data['Close'].to_numpy(dtype=float)
+        mean = _rolling_mean(close, window)
+        std = _rolling_std(close, window)
+        return tuple(pd.Series(band, index=data.index) for band in (mean + std_dev * std, mean, mean - std_dev * std))
+    return tuple(band.to_numpy() for band in shared_cache.bollinger_bands(data['Close'], window, std_dev, compute=compute))
+
+
+def _cached_stochastic(data, window=14, smooth_window=3):
+    def compute():
+        low_min = _rolling_min(data['Low'].to_numpy(dtype=float), window)
+        high_max = _rolling_max(data['High'].to_numpy(dtype=float), window)
+        stoch_k = 100 * _divide(data['Close'].to_numpy(dtype=float) - low_min, high_max - low_min)
+        return pd.Series(stoch_k, index=data.index), pd.Series(_rolling_mean(stoch_k, smooth_window), index=data.index)
+    stoch_k, stoch_d = shared_cache.stochastic(data['High'], data['Low'], data['Close'], window, smooth_window, compute=compute)
+    return stoch_k.to_numpy(), stoch_d.to_numpy()
+
+
+class IndicatorEngine:
+    @staticmethod
+    def compute(data, dtype=None):
+        """
+        Compute the 18 indicators of FeatureEngineering.add_indicators in one pass.
+        Shared primitives (previous close, true range, typical price, rolling sums and
+        high/low extremes) are computed once in NumPy and every indicator is derived from
+        them. Returns a DataFrame block with the same columns and values as the individual
+        Indicators methods, indexed like data.
+        """
+        try:
+            high = data['High'].to_numpy(dtype=float)
+            low = data['Low'].to_numpy(dtype=float)
+            close = data['Close'].to_numpy(dtype=float)
+            volume = data['Volume'].to_numpy(dtype=float)
+
+            # Shared primitives
+            prev_close = _shift(close)
+            price_range = high - low
+            true_range = np.fmax(price_range, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+            typical_price = (high + low + close) / 3.0
+            high_max = {window: _rolling_max(high, window) for window in (9, 26, 52)}
+            low_min = {window: _rolling_min(low, window) for window in (9, 26, 52)}
+            volume_sum = {window: _rolling_sum(volume, window) for window in (14, 20)}
+            close_mean_20 = _rolling_mean(close, 20)
+            clv = _divide((close - low) - (high - close), price_range)
+            clv[np.isnan(clv)] = 0.0
+
+            block = {}
+            # Moving averages
+            block['MA_20'] = close_mean_20
+            block['EMA_20'] = ema(close, window=20, min_periods=20)
+
+            # Momentum
+            block['RSI'] = _cached_rsi(data, 14)
+
+            # Volatility and trend
+            bb_high, bb_mid, bb_low = _cached_bollinger_bands(data, 20, 2)
+            block['BB_High'] = bb_high
+            block['BB_Low'] = bb_low
+            block['BB_Mid'] = bb_mid
+
+            macd = ema(close, window=12, min_periods=12) - ema(close, window=26, min_periods=26)
+            macd_signal = ema(macd, window=9, min_periods=9)
+            block['MACD'] = macd
+            block['MACD_Signal'] = macd_signal
+            block['MACD_Hist'] = macd - macd_signal
+
+            block['ATR'] = wilder(true_range, 14)
+
+            block['Stoch_K'], block['Stoch_D'] = _cached_stochastic(data, 14, 3)
+
+            block['CCI'] = _divide(typical_price - _rolling_mean(typical_price, 20), 0.015 * _rolling_mad(typical_price, 20))
+
+            conversion = 0.5 * (high_max[9] + low_min[9])
+            base = 0.5 * (high_max[26] + low_min[26])
+            block['Ichimoku_Conversion'] = conversion
+            block['Ichimoku_Base'] = base
+            block['Ichimoku_LeadingA'] = 0.5 * (conversion + base)
+            # ta computes the leading span B with min_periods=0, so it is defined from the first bar
+            block['Ichimoku_LeadingB'] = 0.5 * (
+                pd.Series(high).rolling(52, min_periods=0).max().to_numpy()
+                + pd.Series(low).rolling(52, min_periods=0).min().to_numpy()
+            )
+
+            block['Aroon_Up'] = _rolling_reduce(high, 26, np.argmax) / 25 * 100
+            block['Aroon_Down'] = _rolling_reduce(low, 26, np.argmin) / 25 * 100
+
+            block['Parabolic_SAR'] = psar(high, low, close, 0.02, 0.2)
+
+            # Volume
+            block['VWAP'] = _divide(_rolling_sum(typical_price * volume, 14), volume_sum[14])
+            block['OBV'] = np.cumsum(np.where(close < prev_close, -volume, volume))
+
+            prev_typical_price = _shift(typical_price)
+            direction = np.where(typical_price > prev_typical_price, 1, np.where(typical_price < prev_typical_price, -1, 0))
+            money_flow = typical_price * volume * direction
+            positive_flow = _rolling_sum(np.where(money_flow >= 0.0, money_flow, 0.0), 14)
+            negative_flow = np.abs(_rolling_sum(np.where(money_flow < 0.0, money_flow, 0.0), 14))
+            positive_flow[np.isnan(_rolling_sum(money_flow, 14))] = np.nan
+            block['MFI'] = 100 - 100 / (1 + _divide(positive_flow, negative_flow))
+
+            block['CMF'] = _divide(_rolling_sum(clv * volume, 20), volume_sum[20])
+            block['EOM'] = _divide((np.r_[np.nan, np.diff(high)] + np.r_[np.nan, np.diff(low)]) * price_range, 2 * volume) * 100000000
+            block['ADI'] = np.cumsum(clv * volume)
+
+            buying_pressure = close - np.minimum(low, prev_close)
+            average = {
+                window: _divide(_rolling_sum(buying_pressure, window), _rolling_sum(true_range, window))
+                for window in (7, 14, 28)
+            }
+            block['Ultimate_Oscillator'] = 100.0 * (4 * average[7] + 2 * average[14] + average[28]) / 7.0
+
+            block = pd.DataFrame(block, index=data.index)
+            if dtype is not None:
+                block = block.astype(dtype)
+            system_logger.info(f"Indicator engine computed {block.shape[1]} columns for {len(block)} rows.")
+            return block
+        except Exception as e:
+            system_logger.error(f"Error computing indicators in engine: {e}")
+            raise
+
+# Example usage:
+# block = IndicatorEngine.compute(data)
+# data = pd.concat([data, block], axis=1)
@@ -4,10 +4,148 @@ import pandas as pd
 import numpy as np
 import ta
 from App.Logger import System_Log
+from App.Kernels import psar, wilder, ema_sweep, rolling_moments_sweep, supertrend as supertrend_kernel
+from App.Computation_cache import shared_cache
 
 # Setup the logger
 system_logger = System_Log.setup_logger('indicators')
 
+
+# Rolling regime and risk helpers operate along axis 0, so they accept single series (bars,) and panels (bars, tickers)
+def _rolling_moments(values, window, ddof=0, where=None):
+    """
+    Rolling mean and variance (with ddof) over full windows from cumulative sums of x and x**2.
+    where optionally selects the values counted in each window (e.g. negative returns).
+    Windows containing NaN, or holding no more than ddof selected values, give NaN. Values
+    are centred on their mean first, which leaves the variance unchanged but keeps the
+    running sums small.
+    """
+    values = np.asarray(values, dtype=float)
+    mean = np.full(values.shape, np.nan)
+    variance = np.full(values.shape, np.nan)
+    if len(values) < window:
+        return mean, variance
+    missing = np.isnan(values)
+    selected = ~missing if where is None else (np.asarray(where) & ~missing)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shift = np.nan_to_num(np.sum(np.where(selected, values, 0.0), axis=0) / np.sum(selected, axis=0))
+    centred = np.where(selected, values - shift, 0.0)
+    padding = np.zeros((1,) + values.shape[1:])
+
+    def windowed(series):
+        sums = np.concatenate([padding, np.cumsum(series, axis=0)])
+        return sums[window:] - sums[:-window]
+
+    count = windowed(selected.astype(float))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        window_mean = windowed(centred) / count
+        window_variance = np.maximum(windowed(centred ** 2) - count * window_mean ** 2, 0.0) / (count - ddof)
+    invalid = (windowed(missing.astype(float)) > 0) | (count <= ddof)
+    mean[window - 1:] = np.where(invalid, np.nan, window_mean + shift)
+    variance[window - 1:] = np.where(invalid, np.nan, window_variance)
+    return mean, variance
+
+
+def _rolling_variance(values, window):
+    """Rolling population variance over full windows; windows containing NaN give NaN."""
+    return _rolling_moments(values, window)[1]
+
+
+def _rolling_sharpe(returns, window, risk_free_rate, periods_per_year):
+    mean, variance = _rolling_moments(returns, window, ddof=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (mean - risk_free_rate / periods_per_year) / np.sqrt(variance) * np.sqrt(periods_per_year)
+
+
+def _rolling_sortino(returns, window, risk_free_rate, periods_per_year):
+    returns = np.asarray(returns, dtype=float)
+    mean, _ = _rolling_moments(returns, window, ddof=1)
+    with np.errstate(invalid='ignore'):
+        negative = returns < 0
+    # Downside deviation as sortino_ratio: standard deviation of the negative returns in the window
+    _, downside_variance = _rolling_moments(returns, window, ddof=1, where=negative)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (mean - risk_free_rate / periods_per_year) / np.sqrt(downside_variance) * np.sqrt(periods_per_year)
+
+
+def _like_returns(result, returns):
+    if isinstance(returns, pd.DataFrame):
+        return pd.DataFrame(result, index=returns.index, columns=returns.columns)
+    if isinstance(returns, pd.Series):
+        return pd.Series(result, index=returns.index, name=returns.name)
+    return result
+
+
+def _window_sums(values, windows):
+    """
+    Trailing sums of values over each window, shape (bars, windows), from one cumulative sum.
+    Windows that are not yet full or contain NaN give NaN.
+    """
+    values = np.asarray(values, dtype=float)
+    windows = np.asarray(windows, dtype=np.int64)
+    missing = np.isnan(values)
+    sums = np.concatenate([[0.0], np.cumsum(np.where(missing, 0.0, values))])
+    counts = np.concatenate([[0], np.cumsum(missing)])
+    end = np.arange(1, len(values) + 1)[:, None]
+    start = end - windows[None, :]
+    full = start >= 0
+    start = np.where(full, start, 0)
+    result = sums[end] - sums[start]
+    result[~full | (counts[end] - counts[start] > 0)] = np.nan
+    return result
+
+
+def _true_range(data):
+    high = data['High'].to_numpy(dtype=float)
+    low = data['Low'].to_numpy(dtype=float)
+    prev_close = np.r_[np.nan, data['Close'].to_numpy(dtype=float)[:-1]]
+    return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+def _lagged_difference(values, lag):
+    difference = np.full(values.shape, np.nan)
+    difference[lag:] = values[lag:] - values[:-lag]
+    return difference
+
+
+def _rolling_hurst(values, window, max_lag):
+    """
+    Rolling Hurst exponent: for each lag the standard deviation of lagged differences within
+    the trailing window, then the least-squares slope of log(std) on log(lag), solved in
+    closed form so every bar (and every ticker) is fitted at once.
+    """
+    if window <= max_lag + 1:
+        raise ValueError("window must exceed max_lag + 1.")
+    values = np.asarray(values, dtype=float)
+    lags = np.arange(2, max_lag + 1)
+    weights = np.log(lags) - np.log(lags).mean()
+    weights /= np.sum(weights ** 2)
+    slope = np.zeros(values.shape)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for lag, weight in zip(lags, weights):
+            # A window of prices holds window - lag differences at this lag
+            variance = _rolling_variance(_lagged_difference(values, lag), window - lag)
+            slope += weight * 0.5 * np.log(variance)
+    slope[~np.isfinite(slope)] = np.nan
+    return slope
+
+
+def _variance_ratio(values, window, lag):
+    """Rolling Lo-MacKinlay variance ratio Var(lag-bar log returns) / (lag * Var(1-bar log returns))."""
+    log_values = np.log(np.asarray(values, dtype=float))
+    short = _rolling_variance(_lagged_difference(log_values, 1), window - 1)
+    long = _rolling_variance(_lagged_difference(log_values, lag), window - lag)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return long / (lag * short)
+
+
+def _volatility_ratio(values, short_window, long_window):
+    """Short-window over long-window realised volatility of 1-bar log returns."""
+    returns = _lagged_difference(np.log(np.asarray(values, dtype=float)), 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.sqrt(_rolling_variance(returns, short_window) / _rolling_variance(returns, long_window))
+
+
 class Indicators:
     @staticmethod
     def moving_average(data, window=20):
@@ -41,7 +179,7 @@ class Indicators:
         Calculate Relative Strength Index (RSI).
         """
         try:
-            data['RSI'] = ta.momentum.RSIIndicator(data['Close'], window=window).rsi()
+            data['RSI'] = shared_cache.rsi(data['Close'], window)
             system_logger.info(f"Relative Strength Index (window={window}) calculated successfully.")
             return data
         except Exception as e:
@@ -54,10 +192,7 @@ class Indicators:
         Calculate Bollinger Bands.
         """
         try:
-            bb = ta.volatility.BollingerBands(data['Close'], window=window, window_dev=std_dev)
-            data['BB_High'] = bb.bollinger_hband()
-            data['BB_Low'] = bb.bollinger_lband()
-            data['BB_Mid'] = bb.bollinger_mavg()
+            data['BB_High'], data['BB_Mid'], data['BB_Low'] = shared_cache.bollinger_bands(data['Close'], window, std_dev)
             system_logger.info(f"Bollinger Bands (window={window}, std_dev={std_dev}) calculated successfully.")
             return data
         except Exception as e:
@@ -84,9 +219,10 @@ class Indicators:
     def average_true_range(data, window=14):
         """
         Calculate Average True Range (ATR).
+        Wilder smoothing runs in the compiled kernel; values match ta.volatility.AverageTrueRange.
         """
         try:
-            data['ATR'] = ta.volatility.AverageTrueRange(data['High'], data['Low'], data['Close'], window=window).average_true_range()
+            data['ATR'] = wilder(_true_range(data), window)
             system_logger.info(f"Average True Range (window={window}) calculated successfully.")
             return data
         except Exception as e:
@@ -99,9 +235,7 @@ class Indicators:
         Calculate Stochastic Oscillator.
         """
         try:
-            stoch = ta.momentum.StochasticOscillator(data['High'], data['Low'], data['Close'], window=window, smooth_window=smooth_window)
-            data['Stoch_K'] = stoch.stoch()
-            data['Stoch_D'] = stoch.stoch_signal()
+            data['Stoch_K'], data['Stoch_D'] = shared_cache.stochastic(data['High'], data['Low'], data['Close'], window, smooth_window)
             system_logger.info(f"Stochastic Oscillator (window={window}, smooth_window={smooth_window}) calculated successfully.")
             return data
         except Exception as e:
@@ -144,7 +278,7 @@ class Indicators:
         Calculate Aroon Indicator.
         """
         try:
-            aroon = ta.trend.AroonIndicator(data['Close'], window=window)
+            aroon = ta.trend.AroonIndicator(data['High'], data['Low'], window=window)
             data['Aroon_Up'] = aroon.aroon_up()
             data['Aroon_Down'] = aroon.aroon_down()
             system_logger.info(f"Aroon Indicator (window={window}) calculated successfully.")
@@ -157,15 +291,34 @@ class Indicators:
     def parabolic_sar(data, acceleration=0.02, maximum=0.2):
         """
         Calculate Parabolic SAR.
+        The recursion runs in the compiled kernel; values match ta.trend.PSARIndicator.
         """
         try:
-            data['Parabolic_SAR'] = ta.trend.PSARIndicator(data['High'], data['Low'], data['Close'], step=acceleration, max_step=maximum).psar()
+            data['Parabolic_SAR'] = psar(data['High'], data['Low'], data['Close'], step=acceleration, max_step=maximum)
             system_logger.info(f"Parabolic SAR (acceleration={acceleration}, maximum={maximum}) calculated successfully.")
             return data
         except Exception as e:
             system_logger.error(f"Error calculating Parabolic SAR: {e}")
             raise
 
+    @staticmethod
+    def supertrend(data, window=10, multiplier=3.0):
+        """
+        Calculate Supertrend (ATR bands around the bar midpoint that trail price).
+        Supertrend_Direction is 1 in an uptrend, -1 in a downtrend and 0 before the ATR is seeded.
+        """
+        try:
+            atr = wilder(_true_range(data), window)
+            atr[:window - 1] = np.nan
+            line, direction = supertrend_kernel(data['High'], data['Low'], data['Close'], atr, multiplier)
+            data['Supertrend'] = line
+            data['Supertrend_Direction'] = direction.astype(int)
+            system_logger.info(f"Supertrend (window={window}, multiplier={multiplier}) calculated successfully.")
+            return data
+        except Exception as e:
+            system_logger.error(f"Error calculating Supertrend: {e}")
+            raise
+
     @staticmethod
     def volume_weighted_average_price(data, window=14):
         """
@@ -259,6 +412,71 @@ class Indicators:
             system_logger.error(f"Error calculating Ultimate Oscillator: {e}")
             raise
 
+    @staticmethod
+    def moving_average_sweep(data, windows):
+        """
+        Calculate Moving Averages for several windows at once.
+        Returns an array of shape (bars, len(windows)) whose columns match moving_average.
+        """
+        try:
+            windows = np.asarray(windows)
+            sweep = _window_sums(data['Close'].to_numpy(dtype=float), windows) / windows
+            system_logger.info(f"Moving Average sweep ({len(windows)} windows) calculated successfully.")
+            return sweep
+        except Exception as e:
+            system_logger.error(f"Error calculating Moving Average sweep: {e}")
+            raise
+
+    @staticmethod
+    def exponential_moving_average_sweep(data, windows):
+        """
+        Calculate Exponential Moving Averages for several windows in one pass over the bars.
+        Returns an array of shape (bars, len(windows)) whose columns match exponential_moving_average.
+        """
+        try:
+            sweep = ema_sweep(data['Close'].to_numpy(dtype=float), windows)
+            system_logger.info(f"Exponential Moving Average sweep ({len(windows)} windows) calculated successfully.")
+            return sweep
+        except Exception as e:
+            system_logger.error(f"Error calculating Exponential Moving Average sweep: {e}")
+            raise
+
+    @staticmethod
+    def z_score_sweep(data, windows):
+        """
+        Calculate Z-Scores for several windows in one pass over the bars.
+        Returns an array of shape (bars, len(windows)) whose columns match z_score.
+        """
+        try:
+            close = data['Close'].to_numpy(dtype=float)
+            mean, std = rolling_moments_sweep(close, windows)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                sweep = (close[:, None] - mean) / std
+            system_logger.info(f"Z-Score sweep ({len(windows)} windows) calculated successfully.")
+            return sweep
+        except Exception as e:
+            system_logger.error(f"Error calculating Z-Score sweep: {e}")
+            raise
+
+    @staticmethod
+    def rate_of_change_sweep(data, windows):
+        """
+        Calculate Rate of Change (%) for several windows.
+        Returns an array of shape (bars, len(windows)) whose columns match rate_of_change.
+        """
+        try:
+            close = data['Close'].to_numpy(dtype=float)
+            windows = np.asarray(windows, dtype=np.int64)
+            previous = np.arange(len(close))[:, None] - windows[None, :]
+            lagged = np.where(previous >= 0, close[np.maximum(previous, 0)], np.nan)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                sweep = (close[:, None] / lagged - 1) * 100
+            system_logger.info(f"Rate of Change sweep ({len(windows)} windows) calculated successfully.")
+            return sweep
+        except Exception as e:
+            system_logger.error(f"Error calculating Rate of Change sweep: {e}")
+            raise
+
     @staticmethod
     def z_score(data, window=20):
         """
@@ -275,14 +493,19 @@ class Indicators:
             raise
     
     @staticmethod
-    def sharpe_ratio(returns, risk_free_rate=0.02):
+    def sharpe_ratio(returns, risk_free_rate=0.02, periods_per_year=None):
         """
         Calculate Sharpe Ratio.
+        With periods_per_year, risk_free_rate is taken as annual, converted to a per-period
+        rate and the ratio is annualised; otherwise both are used per period as given.
         """
         try:
             return_mean = returns.mean()
             return_std = returns.std()
-            sharpe_ratio = (return_mean - risk_free_rate) / return_std
+            if periods_per_year is None:
+                sharpe_ratio = (return_mean - risk_free_rate) / return_std
+            else:
+                sharpe_ratio = (return_mean - risk_free_rate / periods_per_year) / return_std * np.sqrt(periods_per_year)
             system_logger.info("Sharpe Ratio calculated successfully.")
             return sharpe_ratio
         except Exception as e:
@@ -290,19 +513,51 @@ class Indicators:
             raise
     
     @staticmethod
-    def sortino_ratio(returns, risk_free_rate=0.02):
+    def sortino_ratio(returns, risk_free_rate=0.02, periods_per_year=None):
         """
         Calculate Sortino Ratio (downside risk measurement).
+        periods_per_year annualises as in sharpe_ratio.
         """
         try:
             downside_returns = returns[returns < 0]
             downside_std = downside_returns.std()
-            sortino_ratio = (returns.mean() - risk_free_rate) / downside_std
+            if periods_per_year is None:
+                sortino_ratio = (returns.mean() - risk_free_rate) / downside_std
+            else:
+                sortino_ratio = (returns.mean() - risk_free_rate / periods_per_year) / downside_std * np.sqrt(periods_per_year)
             system_logger.info("Sortino Ratio calculated successfully.")
             return sortino_ratio
         except Exception as e:
             system_logger.error(f"Error calculating Sortino Ratio: {e}")
             raise
+
+    @staticmethod
+    def rolling_sharpe_ratio(returns, window=252, risk_free_rate=0.02, periods_per_year=252):
+        """
+        Calculate an annualised rolling Sharpe Ratio from running sums.
+        returns may be a Series, or a (dates, strategies/tickers) DataFrame or array to rank
+        a whole universe at once; the result has the same shape and type.
+        """
+        try:
+            result = _rolling_sharpe(np.asarray(returns, dtype=float), window, risk_free_rate, periods_per_year)
+            system_logger.info(f"Rolling Sharpe Ratio (window={window}) calculated successfully.")
+            return _like_returns(result, returns)
+        except Exception as e:
+            system_logger.error(f"Error calculating rolling Sharpe Ratio: {e}")
+            raise
+
+    @staticmethod
+    def rolling_sortino_ratio(returns, window=252, risk_free_rate=0.02, periods_per_year=252):
+        """
+        Calculate an annualised rolling Sortino Ratio from running sums, for a Series or a panel.
+        """
+        try:
+            result = _rolling_sortino(np.asarray(returns, dtype=float), window, risk_free_rate, periods_per_year)
+            system_logger.info(f"Rolling Sortino Ratio (window={window}) calculated successfully.")
+            return _like_returns(result, returns)
+        except Exception as e:
+            system_logger.error(f"Error calculating rolling Sortino Ratio: {e}")
+            raise
     
     @staticmethod
     def pivot_points(data):
@@ -349,14 +604,60 @@ class Indicators:
         """
         try:
             lags = range(2, window)
-            tau = [np.std(np.subtract(data['Close'][lag:], data['Close'][:-lag])) for lag in lags]
+            # Subtract positionally; Series subtraction would align on the index and cancel out
+            close = data['Close'].to_numpy(dtype=float)
+            tau = [np.std(close[lag:] - close[:-lag]) for lag in lags]
             hurst = np.polyfit(np.log(lags), np.log(tau), 1)[0]
             system_logger.info("Hurst Exponent calculated successfully.")
             return hurst
         except Exception as e:
             system_logger.error(f"Error calculating Hurst Exponent: {e}")
             raise
-    
+
+    @staticmethod
+    def rolling_hurst_exponent(data, window=100, max_lag=20):
+        """
+        Calculate a rolling Hurst Exponent over the trailing window of closes.
+        Each value equals hurst_exponent on that window with lags 2..max_lag; values
+        below 0.5 suggest mean reversion and above 0.5 trending behaviour.
+        """
+        try:
+            data['Hurst'] = _rolling_hurst(data['Close'].to_numpy(dtype=float), window, max_lag)
+            system_logger.info(f"Rolling Hurst Exponent (window={window}, max_lag={max_lag}) calculated successfully.")
+            return data
+        except Exception as e:
+            system_logger.error(f"Error calculating rolling Hurst Exponent: {e}")
+            raise
+
+    @staticmethod
+    def variance_ratio(data, window=100, lag=5):
+        """
+        Calculate a rolling variance ratio of log returns.
+        Values near 1 indicate a random walk, above 1 trending and below 1 mean-reverting prices.
+        """
+        try:
+            data['Variance_Ratio'] = _variance_ratio(data['Close'].to_numpy(dtype=float), window, lag)
+            system_logger.info(f"Variance Ratio (window={window}, lag={lag}) calculated successfully.")
+            return data
+        except Exception as e:
+            system_logger.error(f"Error calculating Variance Ratio: {e}")
+            raise
+
+    @staticmethod
+    def volatility_regime(data, short_window=20, long_window=100, threshold=1.0):
+        """
+        Classify the volatility regime from short-term over long-term realised volatility.
+        """
+        try:
+            ratio = _volatility_ratio(data['Close'].to_numpy(dtype=float), short_window, long_window)
+            data['Volatility_Ratio'] = ratio
+            data['High_Volatility'] = ratio > threshold
+            system_logger.info(f"Volatility Regime (short_window={short_window}, long_window={long_window}) calculated successfully.")
+            return data
+        except Exception as e:
+            system_logger.error(f"Error calculating Volatility Regime: {e}")
+            raise
+
     @staticmethod
     def detrended_price_oscillator(data, window=20):
         """
@@ -398,6 +699,7 @@ class Indicators:
 # data = Indicators.ichimoku_cloud(data)
 # data = Indicators.aroon(data)
 # data = Indicators.parabolic_sar(data)
+# data = Indicators.supertrend(data)
 # data = Indicators.volume_weighted_average_price(data)
 # data = Indicators.on_balance_volume(data)
 # data = Indicators.money_flow_index(data)
@@ -405,3 +707,9 @@ class Indicators:
 # data = Indicators.ease_of_movement(data)
 # data = Indicators.accumulation_distribution(data)
 # data = Indicators.ultimate_oscillator(data)
+# data = Indicators.rolling_hurst_exponent(data)
+# data = Indicators.variance_ratio(data)
+# data = Indicators.volatility_regime(data)
+# windows = [5, 10, 20, 50, 100, 200]
+# ma = pd.DataFrame(Indicators.moving_average_sweep(data, windows), index=data.index, columns=[f'MA_{w}' for w in windows])
+# sharpe = Indicators.rolling_sharpe_ratio(returns_panel, window=126)
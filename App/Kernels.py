@@ -0,0 +1,356 @@
+# kernels.py
+
+import numpy as np
+import pandas as pd
+from Config.Config import USE_NUMBA
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Path-dependent recursions are compiled with Numba when it is installed and enabled in
+# Config; otherwise the same functions run as plain Python loops (or pandas, where pandas
+# already provides the recursion in compiled code).
+JIT_ENABLED = USE_NUMBA and numba is not None
+
+
+def _compile(function):
+    if JIT_ENABLED:
+        return numba.njit(cache=True, nogil=True)(function)
+    return function
+
+
+def _as_float_array(values):
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+@_compile
+def _ema_loop(values, alpha, min_periods):
+    # Mirrors pandas ewm(adjust=False, ignore_na=False): a gap of missing values decays the
+    # weight of the previous average before the next observation is folded in
+    result = np.empty(len(values))
+    average = np.nan
+    old_weight = 1.0
+    observations = 0
+    for i in range(len(values)):
+        value = values[i]
+        observed = not np.isnan(value)
+        if observed:
+            observations += 1
+        if not np.isnan(average):
+            old_weight *= 1.0 - alpha
+            if observed:
+                if average != value:
+                    average = (old_weight * average + alpha * value) / (old_weight + alpha)
+                old_weight = 1.0
+        elif observed:
+            average = value
+        result[i] = average if observations >= max(min_periods, 1) else np.nan
+    return result
+
+
+@_compile
+def _ema_sweep_loop(values, alphas, min_periods):
+    # One pass over the bars updates the averages of every window together; values hold no gaps
+    result = np.full((len(values), len(alphas)), np.nan)
+    average = np.full(len(alphas), np.nan)
+    observations = 0
+    for i in range(len(values)):
+        value = values[i]
+        if np.isnan(value):
+            continue
+        observations += 1
+        for j in range(len(alphas)):
+            if np.isnan(average[j]):
+                average[j] = value
+            else:
+                average[j] = alphas[j] * value + (1.0 - alphas[j]) * average[j]
+            if observations >= min_periods[j]:
+                result[i, j] = average[j]
+    return result
+
+
+@_compile
+def _rolling_moments_sweep_loop(values, windows, ddof):
+    # Welford add/remove updates per window (as pandas rolling var), avoiding the cancellation
+    # of cumulative sums of squares; windows containing NaN give NaN
+    n = len(values)
+    means = np.full((n, len(windows)), np.nan)
+    stds = np.full((n, len(windows)), np.nan)
+    for j in range(len(windows)):
+        window = windows[j]
+        mean = 0.0
+        m2 = 0.0
+        count = 0
+        nans = 0
+        for i in range(n):
+            value = values[i]
+            if np.isnan(value):
+                nans += 1
+            else:
+                count += 1
+                delta = value - mean
+                mean += delta / count
+                m2 += delta * (value - mean)
+            if i >= window:
+                old = values[i - window]
+                if np.isnan(old):
+                    nans -= 1
+                else:
+                    count -= 1
+                    if count == 0:
+                        mean = 0.0
+                        m2 = 0.0
+                    else:
+                        delta = old - mean
+                        mean -= delta / count
+                        m2 -= delta * (old - mean)
+            if i >= window - 1 and nans == 0 and count > ddof:
+                means[i, j] = mean
+                stds[i, j] = np.sqrt(max(m2, 0.0) / (count - ddof))
+    return means, stds
+
+
+@_compile
+def _rolling_extreme_loop(values, window, sign):
+    # Monotonic deque of candidate positions held in a flat array: amortised O(1) per bar
+    n = len(values)
+    result = np.full(n, np.nan)
+    queue = np.empty(n, np.int64)
+    head = 0
+    tail = 0
+    last_nan = -1
+    for i in range(n):
+        value = values[i]
+        if np.isnan(value):
+            last_nan = i
+        else:
+            while tail > head and sign * values[queue[tail - 1]] <= sign * value:
+                tail -= 1
+            queue[tail] = i
+            tail += 1
+        while tail > head and queue[head] <= i - window:
+            head += 1
+        if i >= window - 1 and last_nan <= i - window and tail > head:
+            result[i] = values[queue[head]]
+    return result
+
+
+@_compile
+def _wilder_loop(values, window):
+    result = np.zeros(len(values))
+    if len(values) < window:
+        return result
+    total = 0.0
+    for i in range(window):
+        total += values[i]
+    result[window - 1] = total / window
+    for i in range(window, len(values)):
+        result[i] = (result[i - 1] * (window - 1) + values[i]) / window
+    return result
+
+
+@_compile
+def _psar_loop(high, low, close, step, max_step):
+    psar = close.copy()
+    up_trend = True
+    acceleration = step
+    up_trend_high = high[0]
+    down_trend_low = low[0]
+    for i in range(2, len(close)):
+        reversal = False
+        if up_trend:
+            psar[i] = psar[i - 1] + acceleration * (up_trend_high - psar[i - 1])
+            if low[i] < psar[i]:
+                reversal = True
+                psar[i] = up_trend_high
+                down_trend_low = low[i]
+                acceleration = step
+            else:
+                if high[i] > up_trend_high:
+                    up_trend_high = high[i]
+                    acceleration = min(acceleration + step, max_step)
+                if low[i - 2] < psar[i]:
+                    psar[i] = low[i - 2]
+                elif low[i - 1] < psar[i]:
+                    psar[i] = low[i - 1]
+        else:
+            psar[i] = psar[i - 1] - acceleration * (psar[i - 1] - down_trend_low)
+            if high[i] > psar[i]:
+                reversal = True
+                psar[i] = down_trend_low
+                up_trend_high = high[i]
+                acceleration = step
+            else:
+                if low[i] < down_trend_low:
+                    down_trend_low = low[i]
+                    acceleration = min(acceleration + step, max_step)
+                if high[i - 2] > psar[i]:
+                    psar[i] = high[i - 2]
+                elif high[i - 1] > psar[i]:
+                    psar[i] = high[i - 1]
+        up_trend = up_trend != reversal
+    return psar
+
+
+@_compile
+def _adx_loop(high, low, close, window):
+    # Port of ta.trend.ADXIndicator.adx(), including its quirks: the first bar (NaN true range
+    # and moves) is skipped for the seed sums and the final smoothed slot is left at 0
+    n = len(close)
+    result = np.zeros(n)
+    m = n - (window - 1)
+    if m <= window + 1:
+        return result
+    true_range = np.empty(n)
+    pos = np.empty(n)
+    neg = np.empty(n)
+    for j in range(1, n):
+        true_range[j] = max(high[j], close[j - 1]) - min(low[j], close[j - 1])
+        diff_up = high[j] - high[j - 1]
+        diff_down = low[j - 1] - low[j]
+        pos[j] = diff_up if diff_up > diff_down and diff_up > 0 else 0.0
+        neg[j] = diff_down if diff_down > diff_up and diff_down > 0 else 0.0
+    trs = np.zeros(m)
+    dip = np.zeros(m)
+    din = np.zeros(m)
+    for j in range(1, window + 1):
+        trs[0] += true_range[j]
+        dip[0] += pos[j]
+        din[0] += neg[j]
+    for i in range(1, m - 1):
+        trs[i] = trs[i - 1] - trs[i - 1] / window + true_range[window + i]
+        dip[i] = dip[i - 1] - dip[i - 1] / window + pos[window + i]
+        din[i] = din[i - 1] - din[i - 1] / window + neg[window + i]
+    directional_index = np.zeros(m)
+    for i in range(m):
+        plus = 100 * dip[i] / trs[i] if trs[i] != 0 else 0.0
+        minus = 100 * din[i] / trs[i] if trs[i] != 0 else 0.0
+        if plus + minus != 0:
+            directional_index[i] = 100 * abs((plus - minus) / (plus + minus))
+    smoothed = np.zeros(m)
+    total = 0.0
+    for i in range(window):
+        total += directional_index[i]
+    smoothed[window] = total / window
+    for i in range(window + 1, m):
+        smoothed[i] = (smoothed[i - 1] * (window - 1) + directional_index[i - 1]) / window
+    result[window - 1:] = smoothed
+    return result
+
+
+@_compile
+def _supertrend_loop(high, low, close, atr, multiplier):
+    n = len(close)
+    supertrend = np.full(n, np.nan)
+    direction = np.zeros(n)
+    upper = np.nan
+    lower = np.nan
+    trend = 1.0
+    for i in range(n):
+        middle = (high[i] + low[i]) / 2.0
+        basic_upper = middle + multiplier * atr[i]
+        basic_lower = middle - multiplier * atr[i]
+        if np.isnan(basic_upper) or np.isnan(basic_lower):
+            upper = np.nan
+            lower = np.nan
+            continue
+        if np.isnan(upper):
+            upper = basic_upper
+            lower = basic_lower
+            trend = 1.0 if close[i] >= middle else -1.0
+        else:
+            if close[i] > upper:
+                trend = 1.0
+            elif close[i] < lower:
+                trend = -1.0
+            # Bands only tighten while price stays inside them
+            if basic_upper < upper or close[i - 1] > upper:
+                upper = basic_upper
+            if basic_lower > lower or close[i - 1] < lower:
+                lower = basic_lower
+        supertrend[i] = lower if trend > 0 else upper
+        direction[i] = trend
+    return supertrend, direction
+
+
+def ema(values, window=None, alpha=None, min_periods=0):
+    """
+    Recursive (adjust=False) exponential moving average of a 1-D array, matching pandas ewm.
+    Give either window (span) or alpha.
+    """
+    alpha = 2.0 / (window + 1) if alpha is None else alpha
+    if not JIT_ENABLED:
+        ewm = pd.Series(values, dtype=float).ewm(alpha=alpha, min_periods=min_periods, adjust=False)
+        return ewm.mean().to_numpy()
+    return _ema_loop(_as_float_array(values), float(alpha), int(min_periods))
+
+
+def ema_sweep(values, windows):
+    """
+    Exponential moving averages of a 1-D array for several windows, as an array of shape
+    (len(values), len(windows)); column j matches ema(values, window=windows[j], min_periods=windows[j]).
+    Missing values are skipped rather than decayed, so inputs should be gap-free after their start.
+    """
+    windows = np.asarray(windows, dtype=np.int64)
+    if not JIT_ENABLED:
+        return np.column_stack([ema(values, window=window, min_periods=window) for window in windows])
+    return _ema_sweep_loop(_as_float_array(values), 2.0 / (windows + 1.0), windows)
+
+
+def rolling_moments_sweep(values, windows, ddof=1):
+    """
+    Rolling mean and standard deviation of a 1-D array for several windows, as two arrays of
+    shape (len(values), len(windows)) matching pandas rolling(window).mean() and .std(ddof).
+    """
+    windows = np.asarray(windows, dtype=np.int64)
+    if not JIT_ENABLED:
+        rolling = [pd.Series(values, dtype=float).rolling(window) for window in windows]
+        return (np.column_stack([r.mean().to_numpy() for r in rolling]),
+                np.column_stack([r.std(ddof=ddof).to_numpy() for r in rolling]))
+    return _rolling_moments_sweep_loop(_as_float_array(values), windows, int(ddof))
+
+
+def rolling_extreme(values, window, maximum=True):
+    """
+    Rolling maximum (or minimum) over full windows with a monotonic deque; windows containing
+    NaN give NaN, as pandas rolling(window).max().
+    """
+    if not JIT_ENABLED:
+        rolling = pd.Series(values, dtype=float).rolling(window)
+        return (rolling.max() if maximum else rolling.min()).to_numpy()
+    return _rolling_extreme_loop(_as_float_array(values), int(window), 1.0 if maximum else -1.0)
+
+
+def wilder(values, window):
+    """
+    Wilder smoothing as ta's Average True Range: zeros before the first full window, the mean
+    of that window as seed, then out[i] = (out[i-1] * (window - 1) + values[i]) / window.
+    A NaN in values propagates to every later output, with or without Numba.
+    """
+    # Always the loop, compiled or not: pandas ewm skips NaN where the loop propagates it
+    return _wilder_loop(_as_float_array(values), int(window))
+
+
+def psar(high, low, close, step=0.02, max_step=0.2):
+    """Parabolic SAR recursion, reproducing ta.trend.PSARIndicator.psar()."""
+    return _psar_loop(_as_float_array(high), _as_float_array(low), _as_float_array(close), float(step), float(max_step))
+
+
+def adx(high, low, close, window=14):
+    """Average Directional Index, reproducing ta.trend.ADXIndicator.adx() (zeros before it is seeded)."""
+    return _adx_loop(_as_float_array(high), _as_float_array(low), _as_float_array(close), int(window))
+
+
+def supertrend(high, low, close, atr, multiplier=3.0):
+    """
+    Supertrend line and direction (1 up, -1 down, 0 before the ATR is available).
+    Bars where atr is NaN are skipped and restart the recursion.
+    """
+    return _supertrend_loop(_as_float_array(high), _as_float_array(low), _as_float_array(close),
+                            _as_float_array(atr), float(multiplier))
+
+# Example usage:
+# sar = psar(data['High'], data['Low'], data['Close'])
+# atr = wilder(true_range, 14)
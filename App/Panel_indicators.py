@@ -0,0 +1,181 @@
+# panel_indicators.py
+
+import numpy as np
+import pandas as pd
+from Logger import System_Log
+from Indicator_engine import _shift, _rolling_mean, _rolling_max, _rolling_min, _rolling_std, _divide
+from Indicators import _rolling_hurst, _variance_ratio, _volatility_ratio, _rolling_sharpe, _rolling_sortino
+
+# Setup the logger
+system_logger = System_Log.setup_logger('panel_indicators')
+
+
+def _values(panel):
+    return panel.to_numpy(dtype=float) if isinstance(panel, pd.DataFrame) else np.asarray(panel, dtype=float)
+
+
+def _like(result, panel):
+    if isinstance(panel, pd.DataFrame):
+        return pd.DataFrame(result, index=panel.index, columns=panel.columns)
+    return result
+
+
+def _ewm(values, window=None, alpha=None, min_periods=0):
+    # Each column starts at its own first valid value; bars where the input is missing stay NaN
+    result = pd.DataFrame(values).ewm(span=window, alpha=alpha, min_periods=min_periods, adjust=False).mean().to_numpy()
+    result[np.isnan(values)] = np.nan
+    return result
+
+
+class PanelIndicators:
+    """
+    Indicators computed for a whole universe at once.
+    Inputs are aligned 2-D panels of shape (dates, tickers), as NumPy arrays or DataFrames,
+    and every indicator is evaluated in a single vectorized pass along the date axis.
+    NaN marks bars where a ticker is not listed (before listing, after delisting or during
+    gaps); each ticker's recursions start at its first valid bar, so a column matches the
+    single-ticker Indicators result over the ticker's listed span.
+    """
+
+    @staticmethod
+    def build_panel(frames, column='Close'):
+        """
+        Align one column of {ticker: DataFrame} frames (DataHandler schema) into a dates x tickers DataFrame.
+        """
+        try:
+            series = {ticker: data.set_index('Date')[column] for ticker, data in frames.items()}
+            panel = pd.concat(series, axis=1).sort_index()
+            system_logger.info(f"Built {column} panel of {panel.shape[0]} dates x {panel.shape[1]} tickers.")
+            return panel
+        except Exception as e:
+            system_logger.error(f"Error building {column} panel: {e}")
+            raise
+
+    @staticmethod
+    def moving_average(close, window=20):
+        """Simple moving average of every ticker."""
+        return _like(_rolling_mean(_values(close), window), close)
+
+    @staticmethod
+    def exponential_moving_average(close, window=20):
+        """Exponential moving average of every ticker."""
+        return _like(_ewm(_values(close), window=window, min_periods=window), close)
+
+    @staticmethod
+    def relative_strength_index(close, window=14):
+        """Relative Strength Index of every ticker."""
+        values = _values(close)
+        diff = values - _shift(values)
+        listed = ~np.isnan(values)
+        up = np.where(listed, np.where(diff > 0, diff, 0.0), np.nan)
+        down = np.where(listed, np.where(diff < 0, -diff, 0.0), np.nan)
+        ema_up = _ewm(up, alpha=1.0 / window, min_periods=window)
+        ema_down = _ewm(down, alpha=1.0 / window, min_periods=window)
+        rsi = np.where(ema_down == 0, 100.0, 100.0 - 100.0 / (1.0 + _divide(ema_up, ema_down)))
+        rsi[~listed] = np.nan
+        return _like(rsi, close)
+
+    @staticmethod
+    def bollinger_bands(close, window=20, std_dev=2):
+        """Bollinger Bands of every ticker, returned as (high, mid, low) panels."""
+        values = _values(close)
+        mid = _rolling_mean(values, window)
+        std = _rolling_std(values, window)
+        return _like(mid + std_dev * std, close), _like(mid, close), _like(mid - std_dev * std, close)
+
+    @staticmethod
+    def macd(close, window_slow=26, window_fast=12, window_sign=9):
+        """MACD of every ticker, returned as (macd, signal, histogram) panels."""
+        values = _values(close)
+        macd = _ewm(values, window=window_fast, min_periods=window_fast) - _ewm(values, window=window_slow, min_periods=window_slow)
+        signal = _ewm(macd, window=window_sign, min_periods=window_sign)
+        return _like(macd, close), _like(signal, close), _like(macd - signal, close)
+
+    @staticmethod
+    def average_true_range(high, low, close, window=14):
+        """
+        Average True Range of every ticker with Wilder smoothing.
+        Unlike ta, bars before the first full window are NaN rather than 0.
+        """
+        high_values, low_values, close_values = _values(high), _values(low), _values(close)
+        prev_close = _shift(close_values)
+        true_range = np.fmax(high_values - low_values,
+                             np.fmax(np.abs(high_values - prev_close), np.abs(low_values - prev_close)))
+
+        # Seed each ticker with the mean of its first full window of true ranges
+        rows = np.arange(len(true_range))[:, None]
+        listed = ~np.isnan(true_range)
+        first = np.where(listed.any(axis=0), listed.argmax(axis=0), len(true_range))
+        seed_row = first + window - 1
+        seeded = np.where(rows >= seed_row, true_range, np.nan)
+        columns = np.flatnonzero(seed_row < len(true_range))
+        seeded[seed_row[columns], columns] = _rolling_mean(true_range, window)[seed_row[columns], columns]
+        return _like(_ewm(seeded, alpha=1.0 / window), close)
+
+    @staticmethod
+    def stochastic_oscillator(high, low, close, window=14, smooth_window=3):
+        """Stochastic Oscillator of every ticker, returned as (k, d) panels."""
+        low_min = _rolling_min(_values(low), window)
+        high_max = _rolling_max(_values(high), window)
+        k = 100 * _divide(_values(close) - low_min, high_max - low_min)
+        return _like(k, close), _like(_rolling_mean(k, smooth_window), close)
+
+    @staticmethod
+    def on_balance_volume(close, volume):
+        """On-Balance Volume of every ticker, accumulated from its listing date."""
+        close_values, volume_values = _values(close), _values(volume)
+        signed = np.where(close_values < _shift(close_values), -volume_values, volume_values)
+        obv = np.nancumsum(signed, axis=0)
+        obv[np.isnan(close_values) | np.isnan(volume_values)] = np.nan
+        return _like(obv, close)
+
+    @staticmethod
+    def rate_of_change(close, window=14):
+        """Rate of Change (%) of every ticker."""
+        values = _values(close)
+        return _like((_divide(values, _shift(values, window)) - 1) * 100, close)
+
+    @staticmethod
+    def z_score(close, window=20):
+        """Rolling Z-Score of every ticker (sample standard deviation, as Indicators.z_score)."""
+        values = _values(close)
+        std = _rolling_std(values, window) * np.sqrt(window / (window - 1))
+        return _like(_divide(values - _rolling_mean(values, window), std), close)
+
+    @staticmethod
+    def rolling_hurst_exponent(close, window=100, max_lag=20):
+        """Rolling Hurst Exponent of every ticker, as Indicators.rolling_hurst_exponent."""
+        return _like(_rolling_hurst(_values(close), window, max_lag), close)
+
+    @staticmethod
+    def variance_ratio(close, window=100, lag=5):
+        """Rolling variance ratio of every ticker's log returns."""
+        return _like(_variance_ratio(_values(close), window, lag), close)
+
+    @staticmethod
+    def volatility_regime(close, short_window=20, long_window=100, threshold=1.0):
+        """Short over long realised volatility of every ticker, returned as (ratio, high_volatility) panels."""
+        ratio = _volatility_ratio(_values(close), short_window, long_window)
+        return _like(ratio, close), _like(ratio > threshold, close)
+
+    @staticmethod
+    def returns(close, periods=1):
+        """Simple returns of every ticker over the given number of bars."""
+        values = _values(close)
+        return _like(_divide(values, _shift(values, periods)) - 1, close)
+
+    @staticmethod
+    def rolling_sharpe_ratio(returns, window=252, risk_free_rate=0.02, periods_per_year=252):
+        """Annualised rolling Sharpe Ratio of every column (ticker or strategy)."""
+        return _like(_rolling_sharpe(_values(returns), window, risk_free_rate, periods_per_year), returns)
+
+    @staticmethod
+    def rolling_sortino_ratio(returns, window=252, risk_free_rate=0.02, periods_per_year=252):
+        """Annualised rolling Sortino Ratio of every column (ticker or strategy)."""
+        return _like(_rolling_sortino(_values(returns), window, risk_free_rate, periods_per_year), returns)
+
+# Example usage:
+# close = PanelIndicators.build_panel(frames, 'Close')
+# rsi = PanelIndicators.relative_strength_index(close)
+# macd, signal, hist = PanelIndicators.macd(close)
+# hurst = PanelIndicators.rolling_hurst_exponent(close)
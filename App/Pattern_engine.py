@@ -0,0 +1,143 @@
+# pattern_engine.py
+
+import numpy as np
+import pandas as pd
+from Logger import System_Log
+from Kernels import adx
+from Swing_points import SwingPoints
+from Indicator_engine import (_shift, _rolling_mean, _rolling_max, _rolling_min, _divide,
+                              _cached_rsi, _cached_bollinger_bands, _cached_stochastic)
+
+# Setup the logger
+system_logger = System_Log.setup_logger('pattern_engine')
+
+# Pattern flags compute() evaluates; patterns registered in Pattern_flags later have no kernel here
+ENGINE_PATTERNS = (
+    'higher_highs', 'lower_lows', 'double_top', 'head_and_shoulders', 'triple_bottom',
+    'cup_and_handle', 'bullish_engulfing', 'bearish_engulfing', 'morning_star', 'evening_star',
+    'hammer', 'shooting_star', 'rsi_divergence', 'bollinger_band_squeeze', 'ma_crossover',
+    'ma_crossover_signal', 'strong_trend', 'stoch_overbought', 'stoch_oversold', 'pennant',
+    'flag', 'wedge', 'triangle',
+)
+
+
+class PatternEngine:
+    @staticmethod
+    def compute(data, window=20, order=5, tolerance=0.02, dtype=None, patterns=None):
+        """
+        Compute the 20 patterns of FeatureEngineering.add_patterns in one pass.
+        Rolling extremes over window and 2 * window, and the bar-shifted OHLCV views, are
+        computed once in NumPy and every pattern predicate is evaluated from them; the
+        structural patterns are matched on one swing-point index (order, tolerance). Returns a
+        DataFrame block with the same columns (including intermediate columns such as
+        high_max, RSI and adx) and values as the individual Patterns methods, indexed like data.
+        With dtype (e.g. np.float32) values are stored as dtype and flags as uint8. patterns
+        limits the work to the named pattern flags (and the columns computed with them).
+        """
+        try:
+            open_ = data['Open'].to_numpy(dtype=float)
+            high = data['High'].to_numpy(dtype=float)
+            low = data['Low'].to_numpy(dtype=float)
+            close = data['Close'].to_numpy(dtype=float)
+            volume = data['Volume'].to_numpy(dtype=float)
+
+            # Shared primitives: the 2 * window extremes are the extremes of two adjacent windows
+            high_max = _rolling_max(high, window)
+            low_min = _rolling_min(low, window)
+            high_max_2 = np.maximum(high_max, _shift(high_max, window))
+            low_min_2 = np.minimum(low_min, _shift(low_min, window))
+            prev_open, prev_close = _shift(open_), _shift(close)
+            open_2, close_2 = _shift(open_, 2), _shift(close, 2)
+            high_w, low_w, close_w = _shift(high, window), _shift(low, window), _shift(close, window)
+            close_2w = _shift(close, 2 * window)
+            body_size = np.abs(close - open_)
+
+            def want(*names):
+                return patterns is None or any(name in patterns for name in names)
+
+            block = {}
+            with np.errstate(invalid='ignore'):
+                # Chart patterns
+                if want('higher_highs', 'lower_lows', 'cup_and_handle'):
+                    block['high_max'] = high_max
+                    block['low_min'] = low_min
+                    block['higher_highs'] = high > _shift(high_max)
+                    block['lower_lows'] = low < _shift(low_min)
+                if want('double_top', 'head_and_shoulders', 'triple_bottom'):
+                    pivots = SwingPoints.detect(data, order)
+                    block['double_top'] = SwingPoints.double_top(pivots, len(data), tolerance)
+                    block['head_and_shoulders'] = SwingPoints.head_and_shoulders(pivots, len(data), tolerance)
+                    block['triple_bottom'] = SwingPoints.triple_bottom(pivots, len(data), tolerance)
+                if want('cup_and_handle'):
+                    cup = high_max - low_min
+                    handle = _shift(cup, window // 2)
+                    block['cup'] = cup
+                    block['handle'] = handle
+                    block['cup_and_handle'] = handle < cup
+
+                # Candlestick patterns
+                if want('bullish_engulfing', 'bearish_engulfing', 'morning_star', 'evening_star', 'hammer', 'shooting_star'):
+                    block['bullish_engulfing'] = (prev_open > prev_close) & (open_ < close) & (open_ < prev_close) & (close > prev_open)
+                    block['bearish_engulfing'] = (prev_open < prev_close) & (open_ > close) & (open_ > prev_close) & (close < prev_open)
+                    block['morning_star'] = (close_2 < open_2) & (prev_close < prev_open) & (close > open_)
+                    block['evening_star'] = (close_2 > open_2) & (prev_close > prev_open) & (close < open_)
+                    block['hammer'] = (open_ - low > body_size * 2) & (close > open_)
+                    block['shooting_star'] = (high - close > body_size * 2) & (open_ > close)
+
+                # Indicator-based patterns
+                if want('rsi_divergence'):
+                    rsi = _cached_rsi(data, 14)
+                    block['RSI'] = rsi
+                    block['price_diff'] = close - _shift(close, 14)
+                    block['rsi_diff'] = rsi - _shift(rsi, 14)
+                    block['rsi_divergence'] = block['price_diff'] * block['rsi_diff'] < 0
+
+                if want('bollinger_band_squeeze'):
+                    bb_high, _, bb_low = _cached_bollinger_bands(data, 20, 2)
+                    block['bb_squeeze'] = (bb_high - bb_low) / close
+                    block['bollinger_band_squeeze'] = block['bb_squeeze'] < 1.0
+
+                if want('ma_crossover', 'ma_crossover_signal'):
+                    short_ma = _rolling_mean(close, 50)
+                    long_ma = _rolling_mean(close, 200)
+                    ma_crossover = short_ma > long_ma
+                    block['short_ma'] = short_ma
+                    block['long_ma'] = long_ma
+                    block['ma_crossover'] = ma_crossover
+                    block['ma_crossover_signal'] = ma_crossover & ~np.r_[False, ma_crossover[:-1]]
+
+                if want('strong_trend'):
+                    block['adx'] = adx(high, low, close, 14)
+                    block['strong_trend'] = block['adx'] > 25
+
+                if want('stoch_overbought', 'stoch_oversold'):
+                    stoch_k, stoch_d = _cached_stochastic(data, 14, 3)
+                    block['stoch_k'] = stoch_k
+                    block['stoch_d'] = stoch_d
+                    block['stoch_overbought'] = stoch_k > 80
+                    block['stoch_oversold'] = stoch_k < 20
+
+                # Continuation patterns
+                if want('pennant', 'flag'):
+                    block['pennant'] = (close > close_w) & (close < close_2w) & (high < high_w) & (low > low_w)
+                    block['flag'] = block['pennant'] & (volume > _shift(volume, window))
+                if want('wedge'):
+                    block['wedge'] = _divide(high_max - low_min, high_max_2 - low_min_2) < 0.5
+                    block['high_trend'] = high_max
+                    block['low_trend'] = low_min
+                if want('triangle'):
+                    block['triangle'] = (high < high_max) & (low > low_min)
+
+            block = pd.DataFrame(block, index=data.index)
+            if dtype is not None:
+                flags = block.columns[block.dtypes == bool]
+                block = block.astype({column: np.uint8 if column in flags else dtype for column in block.columns})
+            system_logger.info(f"Pattern engine computed {block.shape[1]} columns for {len(block)} rows.")
+            return block
+        except Exception as e:
+            system_logger.error(f"Error computing patterns in engine: {e}")
+            raise
+
+# Example usage:
+# block = PatternEngine.compute(data)
+# data = pd.concat([data, block], axis=1)
@@ -0,0 +1,114 @@
+# pattern_flags.py
+
+import numpy as np
+import pandas as pd
+from Logger import System_Log
+
+# Setup the logger
+system_logger = System_Log.setup_logger('pattern_flags')
+
+FLAG_COLUMN = 'pattern_flags'
+FLAG_BITS = 32
+
+# Pattern name -> bit position in FLAG_COLUMN, in the order add_patterns writes the flags
+PATTERN_BITS = {name: bit for bit, name in enumerate([
+    'higher_highs', 'lower_lows', 'double_top', 'head_and_shoulders', 'triple_bottom',
+    'cup_and_handle', 'bullish_engulfing', 'bearish_engulfing', 'morning_star', 'evening_star',
+    'hammer', 'shooting_star', 'rsi_divergence', 'bollinger_band_squeeze', 'ma_crossover',
+    'ma_crossover_signal', 'strong_trend', 'stoch_overbought', 'stoch_oversold', 'pennant',
+    'flag', 'wedge', 'triangle',
+])}
+
+# Helper columns that only restate other pattern columns; dropped when patterns are packed
+PATTERN_HELPERS = ['high_trend', 'low_trend', 'cup', 'handle']
+
+
+def _flag_values(flags):
+    if isinstance(flags, pd.DataFrame):
+        flags = flags[FLAG_COLUMN]
+    return np.asarray(flags, dtype=np.uint32)
+
+
+class PatternFlags:
+    @staticmethod
+    def register(name):
+        """
+        Assign the next free bit to a new pattern name and return it. Names already in the
+        registry keep their bit.
+        """
+        try:
+            if name not in PATTERN_BITS:
+                if len(PATTERN_BITS) >= FLAG_BITS:
+                    raise ValueError(f"All {FLAG_BITS} pattern bits are in use")
+                PATTERN_BITS[name] = len(PATTERN_BITS)
+                system_logger.info(f"Registered pattern '{name}' on bit {PATTERN_BITS[name]}.")
+            return PATTERN_BITS[name]
+        except Exception as e:
+            system_logger.error(f"Error registering pattern flag: {e}")
+            raise
+
+    @staticmethod
+    def mask(names):
+        """Integer mask with the bits of the given pattern names set."""
+        try:
+            if isinstance(names, str):
+                names = [names]
+            mask = 0
+            for name in names:
+                mask |= 1 << PATTERN_BITS[name]
+            return np.uint32(mask)
+        except KeyError as e:
+            system_logger.error(f"Unknown pattern flag: {e}")
+            raise
+
+    @staticmethod
+    def pack(data, columns=None):
+        """
+        Pack the boolean (or 0/1 uint8) pattern columns of data into one uint32 per bar.
+        columns defaults to every registered pattern present in data. Returns a Series
+        indexed like data.
+        """
+        try:
+            if columns is None:
+                columns = [name for name in PATTERN_BITS if name in data.columns]
+            bits = np.zeros((len(data), FLAG_BITS), dtype=bool)
+            for name in columns:
+                bits[:, PATTERN_BITS[name]] = data[name].to_numpy() != 0
+            packed = np.packbits(bits, axis=1, bitorder='little').view('<u4').ravel()
+            return pd.Series(packed.astype(np.uint32), index=data.index, name=FLAG_COLUMN)
+        except Exception as e:
+            system_logger.error(f"Error packing pattern flags: {e}")
+            raise
+
+    @staticmethod
+    def unpack(flags, names=None):
+        """
+        Expand packed flags (a Series or a frame holding FLAG_COLUMN) back into boolean
+        columns, one per pattern name (default: all registered patterns).
+        """
+        try:
+            if names is None:
+                names = list(PATTERN_BITS)
+            values = _flag_values(flags)
+            bits = np.unpackbits(values.astype('<u4').view(np.uint8).reshape(-1, 4), axis=1, bitorder='little')
+            index = flags.index if isinstance(flags, (pd.Series, pd.DataFrame)) else None
+            return pd.DataFrame({name: bits[:, PATTERN_BITS[name]].astype(bool) for name in names}, index=index)
+        except Exception as e:
+            system_logger.error(f"Error unpacking pattern flags: {e}")
+            raise
+
+    @staticmethod
+    def any(flags, names):
+        """Bool array, True on bars where at least one of the named patterns is set."""
+        return (_flag_values(flags) & PatternFlags.mask(names)) != 0
+
+    @staticmethod
+    def all(flags, names):
+        """Bool array, True on bars where every one of the named patterns is set."""
+        mask = PatternFlags.mask(names)
+        return (_flag_values(flags) & mask) == mask
+
+# Example usage:
+# data['pattern_flags'] = PatternFlags.pack(data)
+# reversal = PatternFlags.any(data, ['bullish_engulfing', 'hammer', 'morning_star'])
+# confirmed = PatternFlags.all(data['pattern_flags'], ['bullish_engulfing', 'stoch_oversold'])
@@ -0,0 +1,115 @@
+# pattern_scanner.py
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from Logger import System_Log
+from Pattern_engine import PatternEngine, ENGINE_PATTERNS
+from Pattern_flags import PatternFlags, PATTERN_BITS
+from App.Computation_cache import shared_cache
+
+# Setup the logger
+system_logger = System_Log.setup_logger('pattern_scanner')
+
+# Bars of history kept before the scanned bars: the 200-bar moving average of ma_crossover
+# plus its one-bar signal shift, with slack for the recursive RSI/ADX smoothing to settle
+WARMUP_BARS = 250
+
+PatternEvent = namedtuple('PatternEvent', ['ticker', 'date', 'pattern'])
+
+
+def _tail(data, rows):
+    return data.iloc[-rows:] if len(data) > rows else data
+
+
+def _events(ticker, data, patterns, last):
+    """Evaluate only the requested patterns on data and return their events on its last bars."""
+    block = PatternEngine.compute(data, patterns=patterns)
+    shared_cache.clear()
+    flags = PatternFlags.pack(block, patterns).to_numpy()[-last:]
+    dates = data['Date'].to_numpy()[-last:] if 'Date' in data.columns else data.index.to_numpy()[-last:]
+    events = []
+    for row in np.flatnonzero(flags):
+        for pattern in patterns:
+            if flags[row] & PatternFlags.mask(pattern):
+                events.append(PatternEvent(ticker, pd.Timestamp(dates[row]), pattern))
+    return events
+
+
+def _scan_chunk(source, tickers, patterns, last, warmup):
+    """
+    Worker entry point. source is either a BarStore, which is pickled as its directory and
+    index only, or a dict of frames already cut to last + warmup bars.
+    """
+    events = []
+    for ticker in tickers:
+        try:
+            if isinstance(source, dict):
+                data = source[ticker]
+            else:
+                data = _tail(source.frame(ticker), last + warmup)
+            events.extend(_events(ticker, data, patterns, last))
+        except Exception as e:
+            system_logger.error(f"Skipping {ticker} in pattern scan: {e}")
+    return events
+
+
+class PatternScanner:
+    @staticmethod
+    def scan(source, patterns=None, last=1, warmup=WARMUP_BARS, tickers=None, max_workers=None, chunk_size=50):
+        """
+        Scan a universe for patterns printed on each ticker's last bars.
+        source is a BarStore (workers map its files themselves) or a dict of ticker -> OHLCV
+        frame. Only the last + warmup bars of each ticker are evaluated, across a process pool
+        of max_workers (max_workers=1 scans in-process). patterns defaults to every registered
+        pattern flag PatternEngine evaluates; naming a pattern that is not registered, or that
+        has no PatternEngine kernel, raises ValueError. Returns a sparse list of PatternEvent(ticker, date, pattern), sorted by
+        date, ticker and registry order; tickers that fail are logged and skipped.
+        """
+        try:
+            if patterns is None:
+                patterns = [pattern for pattern in PATTERN_BITS if pattern in ENGINE_PATTERNS]
+            patterns = list(patterns)
+            unknown = [pattern for pattern in patterns if pattern not in PATTERN_BITS]
+            if unknown:
+                raise ValueError(f"Unknown patterns: {unknown}")
+            unsupported = [pattern for pattern in patterns if pattern not in ENGINE_PATTERNS]
+            if unsupported:
+                raise ValueError(f"Patterns registered without a PatternEngine kernel cannot be scanned: {unsupported}")
+            if tickers is None:
+                tickers = list(source) if isinstance(source, dict) else source.tickers()
+
+            chunks = [tickers[i:i + chunk_size] for i in range(0, len(tickers), chunk_size)]
+            if isinstance(source, dict):
+                # Send each worker only the bars it needs
+                sources = [{ticker: _tail(source[ticker], last + warmup) for ticker in chunk} for chunk in chunks]
+            else:
+                sources = [source] * len(chunks)
+
+            events = []
+            if max_workers == 1:
+                for chunk_source, chunk in zip(sources, chunks):
+                    events.extend(_scan_chunk(chunk_source, chunk, patterns, last, warmup))
+            else:
+                with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                    for chunk_events in executor.map(_scan_chunk, sources, chunks, [patterns] * len(chunks),
+                                                     [last] * len(chunks), [warmup] * len(chunks)):
+                        events.extend(chunk_events)
+
+            events.sort(key=lambda event: (event.date, event.ticker, PATTERN_BITS[event.pattern]))
+            system_logger.info(f"Pattern scan of {len(tickers)} tickers over the last {last} bars found {len(events)} events.")
+            return events
+        except Exception as e:
+            system_logger.error(f"Error scanning patterns: {e}")
+            raise
+
+    @staticmethod
+    def to_frame(events):
+        """Return events as a DataFrame with columns ticker, date and pattern."""
+        return pd.DataFrame(events, columns=PatternEvent._fields)
+
+# Example usage:
+# store = BarStore().append(DataHandler.run_many(tickers, '2023-01-01', '2024-01-01'))
+# events = PatternScanner.scan(store, patterns=['bullish_engulfing', 'morning_star'], last=1)
+# print(PatternScanner.to_frame(events))
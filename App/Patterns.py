@@ -4,6 +4,8 @@ import pandas as pd
 import numpy as np
 import ta
 from Logger import System_Log
+from App.Computation_cache import shared_cache
+from Swing_points import SwingPoints
 
 # Setup the logger
 system_logger = System_Log.setup_logger('patterns')
@@ -15,8 +17,8 @@ class Patterns:
         Identify Higher Highs and Lower Lows in the data.
         """
         try:
-            data['high_max'] = data['High'].rolling(window=window).max()
-            data['low_min'] = data['Low'].rolling(window=window).min()
+            data['high_max'] = shared_cache.rolling_max(data['High'], window)
+            data['low_min'] = shared_cache.rolling_min(data['Low'], window)
             data['higher_highs'] = data['High'] > data['high_max'].shift(1)
             data['lower_lows'] = data['Low'] < data['low_min'].shift(1)
             system_logger.info("Higher Highs and Lower Lows identified successfully.")
@@ -26,13 +28,14 @@ class Patterns:
             raise
 
     @staticmethod
-    def double_top(data, window=20):
+    def double_top(data, order=5, tolerance=0.02):
         """
         Identify Double Top pattern in the data.
+        Two matching swing highs around a swing low, flagged when the second peak is confirmed.
         """
         try:
-            data['high_max'] = data['High'].rolling(window=window).max()
-            data['double_top'] = (data['High'] == data['high_max']) & (data['High'].shift(window) == data['high_max'])
+            pivots = SwingPoints.detect(data, order)
+            data['double_top'] = SwingPoints.double_top(pivots, len(data), tolerance)
             system_logger.info("Double Top pattern identified successfully.")
             return data
         except Exception as e:
@@ -40,16 +43,14 @@ class Patterns:
             raise
 
     @staticmethod
-    def head_and_shoulders(data, window=20):
+    def head_and_shoulders(data, order=5, tolerance=0.02):
         """
         Identify Head and Shoulders pattern in the data.
+        Three swing highs with a higher head, flagged when the right shoulder is confirmed.
         """
         try:
-            data['head_and_shoulders'] = ((data['High'].shift(2*window) < data['High'].shift(window)) &
-                                          (data['High'] > data['High'].shift(window)) &
-                                          (data['High'] > data['High'].shift(2*window)) &
-                                          (data['High'].shift(window) < data['High'].shift(2*window)) &
-                                          (data['High'] < data['High'].shift(2*window)))
+            pivots = SwingPoints.detect(data, order)
+            data['head_and_shoulders'] = SwingPoints.head_and_shoulders(pivots, len(data), tolerance)
             system_logger.info("Head and Shoulders pattern identified successfully.")
             return data
         except Exception as e:
@@ -57,15 +58,14 @@ class Patterns:
             raise
 
     @staticmethod
-    def triple_bottom(data, window=20):
+    def triple_bottom(data, order=5, tolerance=0.02):
         """
         Identify Triple Bottom pattern in the data.
+        Three matching swing lows, flagged when the third low is confirmed.
         """
         try:
-            data['low_min'] = data['Low'].rolling(window=window).min()
-            data['triple_bottom'] = ((data['Low'] == data['low_min']) &
-                                     (data['Low'].shift(window) == data['low_min']) &
-                                     (data['Low'].shift(2*window) == data['low_min']))
+            pivots = SwingPoints.detect(data, order)
+            data['triple_bottom'] = SwingPoints.triple_bottom(pivots, len(data), tolerance)
             system_logger.info("Triple Bottom pattern identified successfully.")
             return data
         except Exception as e:
@@ -78,7 +78,7 @@ class Patterns:
         Identify Cup and Handle pattern in the data.
         """
         try:
-            data['cup'] = (data['High'].rolling(window).max() - data['Low'].rolling(window).min())
+            data['cup'] = shared_cache.rolling_max(data['High'], window) - shared_cache.rolling_min(data['Low'], window)
             data['handle'] = (data['High'].shift(window//2).rolling(window).max() - data['Low'].shift(window//2).rolling(window).min())
             data['cup_and_handle'] = data['handle'] < data['cup']
             system_logger.info("Cup and Handle pattern identified successfully.")
@@ -185,7 +185,7 @@ class Patterns:
         Identify RSI Divergence in the data.
         """
         try:
-            data['RSI'] = ta.momentum.RSIIndicator(data['Close'], window=window).rsi()
+            data['RSI'] = shared_cache.rsi(data['Close'], window)
             data['price_diff'] = data['Close'].diff(window)
             data['rsi_diff'] = data['RSI'].diff(window)
             data['rsi_divergence'] = (data['price_diff'] * data['rsi_diff'] < 0)
@@ -201,8 +201,8 @@ class Patterns:
         Identify Bollinger Band Squeeze in the data.
         """
         try:
-            bb = ta.volatility.BollingerBands(data['Close'], window=window, window_dev=std_dev)
-            data['bb_squeeze'] = (bb.bollinger_hband() - bb.bollinger_lband()) / data['Close']
+            bb_high, _, bb_low = shared_cache.bollinger_bands(data['Close'], window, std_dev)
+            data['bb_squeeze'] = (bb_high - bb_low) / data['Close']
             data['bollinger_band_squeeze'] = data['bb_squeeze'] < (std_dev / 2)
             system_logger.info("Bollinger Band Squeeze identified successfully.")
             return data
@@ -219,7 +219,7 @@ class Patterns:
             data['short_ma'] = ta.trend.SMAIndicator(data['Close'], window=short_window).sma_indicator()
             data['long_ma'] = ta.trend.SMAIndicator(data['Close'], window=long_window).sma_indicator()
             data['ma_crossover'] = data['short_ma'] > data['long_ma']
-            data['ma_crossover_signal'] = data['ma_crossover'] & ~data['ma_crossover'].shift(1)
+            data['ma_crossover_signal'] = data['ma_crossover'] & ~data['ma_crossover'].shift(1, fill_value=False)
             system_logger.info("Moving Average Crossover identified successfully.")
             return data
         except Exception as e:
@@ -247,9 +247,7 @@ class Patterns:
         Identify Stochastic Oscillator in the data.
         """
         try:
-            stoch = ta.momentum.StochasticOscillator(data['High'], data['Low'], data['Close'], window=window)
-            data['stoch_k'] = stoch.stoch()
-            data['stoch_d'] = stoch.stoch_signal()
+            data['stoch_k'], data['stoch_d'] = shared_cache.stochastic(data['High'], data['Low'], data['Close'], window)
             data['stoch_overbought'] = data['stoch_k'] > 80
             data['stoch_oversold'] = data['stoch_k'] < 20
             system_logger.info("Stochastic Oscillator identified successfully.")
@@ -297,8 +295,8 @@ class Patterns:
         Identify Wedge pattern in the data.
         """
         try:
-            data['wedge'] = ((data['High'].rolling(window).max() - data['Low'].rolling(window).min()) /
-                             (data['High'].rolling(window * 2).max() - data['Low'].rolling(window * 2).min()) < 0.5)
+            data['wedge'] = ((shared_cache.rolling_max(data['High'], window) - shared_cache.rolling_min(data['Low'], window)) /
+                             (shared_cache.rolling_max(data['High'], window * 2) - shared_cache.rolling_min(data['Low'], window * 2)) < 0.5)
             system_logger.info("Wedge pattern identified successfully.")
             return data
         except Exception as e:
@@ -311,8 +309,8 @@ class Patterns:
         Identify Triangle pattern in the data.
         """
         try:
-            data['high_trend'] = data['High'].rolling(window).max()
-            data['low_trend'] = data['Low'].rolling(window).min()
+            data['high_trend'] = shared_cache.rolling_max(data['High'], window)
+            data['low_trend'] = shared_cache.rolling_min(data['Low'], window)
             data['triangle'] = (data['High'] < data['high_trend']) & (data['Low'] > data['low_trend'])
             system_logger.info("Triangle pattern identified successfully.")
             return data
@@ -0,0 +1,164 @@
+# resampler.py
+
+import re
+import warnings
+import numpy as np
+import pandas as pd
+from Logger import System_Log
+
+# Setup the logger
+system_logger = System_Log.setup_logger('resampler')
+
+class BarResampler:
+    COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+    def __init__(self, timeframe):
+        """
+        Initialise a resampler building timeframe bars from base bars.
+        timeframe is either a fixed frequency ('5min', '1h', '1D'), whose bins are floored
+        timestamps, or a single calendar period ('W', 'W-FRI', 'M', 'Q', 'Y'), whose bins are
+        labelled by the period start (weeks start on Monday for 'W'). Anything else, such as
+        multiples of calendar periods ('2M') or business-day anchored offsets, raises ValueError.
+        """
+        self.timeframe = timeframe
+        self.freq, self.period = self._parse_timeframe(timeframe)
+        self.buffers = {column: np.empty(0) for column in self.COLUMNS}
+        self.buffers['Date'] = np.empty(0, dtype='datetime64[ns]')
+        self.size = 0
+        self.tz = None
+
+    @staticmethod
+    def _parse_timeframe(timeframe):
+        """Return (fixed offset, None) or (None, period frequency) for a timeframe."""
+        with warnings.catch_warnings():
+            # Aliases such as 'M' and 'Q' are deprecated as offsets but valid as periods
+            warnings.simplefilter('ignore', FutureWarning)
+            try:
+                offset = pd.tseries.frequencies.to_offset(timeframe)
+            except ValueError:
+                offset = None
+        if isinstance(offset, pd.offsets.Tick):
+            return offset, None
+        # Offset aliases ending in E ('ME', 'QE', 'YE') name the same periods without it
+        for candidate in (timeframe, re.sub(r'(?<=[MQY])E', '', timeframe)):
+            try:
+                period = pd.Period('2000-01-01', freq=candidate).freq
+            except ValueError:
+                continue
+            if period.n == 1:
+                return None, candidate
+        raise ValueError(f"Unsupported timeframe '{timeframe}': use a fixed frequency such as '5min', '1h' or '1D', "
+                         f"or a single calendar period such as 'W', 'W-FRI', 'M', 'Q' or 'Y'.")
+
+    def _bucket(self, dates):
+        if self.period is not None:
+            return dates.dt.to_period(self.period).dt.start_time
+        return dates.dt.floor(self.freq)
+
+    def aggregate(self, data):
+        """
+        Aggregate base bars into timeframe bars in one vectorized pass.
+        data holds OHLCV columns with either a 'Date' column or a DatetimeIndex and must be
+        sorted by time. Returns a dict of column arrays (Open first, High max, Low min,
+        Close last, Volume sum) keyed like the DataHandler schema.
+        """
+        try:
+            dates = pd.Series(data['Date'] if 'Date' in data.columns else data.index)
+            self.tz = dates.dt.tz
+            if self.tz is not None:
+                # Buckets are built on naive wall-clock times and relocalised in bars
+                dates = dates.dt.tz_localize(None)
+            keys = self._bucket(dates).to_numpy(dtype='datetime64[ns]')
+            if len(keys) == 0:
+                return {column: np.empty(0, dtype=buffer.dtype) for column, buffer in self.buffers.items()}
+
+            starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+            ends = np.r_[starts[1:], len(keys)] - 1
+            high = data['High'].to_numpy(dtype=float)
+            low = data['Low'].to_numpy(dtype=float)
+            return {
+                'Date': keys[starts],
+                'Open': data['Open'].to_numpy(dtype=float)[starts],
+                'High': np.maximum.reduceat(high, starts),
+                'Low': np.minimum.reduceat(low, starts),
+                'Close': data['Close'].to_numpy(dtype=float)[ends],
+                'Volume': np.add.reduceat(data['Volume'].to_numpy(dtype=float), starts),
+            }
+        except Exception as e:
+            system_logger.error(f"Error aggregating bars to {self.timeframe}: {e}")
+            raise
+
+    def resample(self, data):
+        """
+        Resample a full history of base bars, replacing any bars accumulated so far.
+        """
+        self.size = 0
+        return self.update(data)
+
+    def update(self, new_bars):
+        """
+        Fold newly arrived base bars into the resampled history.
+        Only the trailing (possibly partial) timeframe bar is revised; earlier bars are left
+        untouched, so the cost depends on the number of new bars rather than the history length.
+        """
+        try:
+            new = self.aggregate(new_bars)
+            count = len(new['Date'])
+            if count == 0:
+                return self.bars
+            if self.size and new['Date'][0] < self.buffers['Date'][self.size - 1]:
+                raise ValueError("New bars must not precede the last resampled bar.")
+
+            if self.size and new['Date'][0] == self.buffers['Date'][self.size - 1]:
+                last = self.size - 1
+                self.buffers['High'][last] = max(self.buffers['High'][last], new['High'][0])
+                self.buffers['Low'][last] = min(self.buffers['Low'][last], new['Low'][0])
+                self.buffers['Close'][last] = new['Close'][0]
+                self.buffers['Volume'][last] += new['Volume'][0]
+                new = {column: values[1:] for column, values in new.items()}
+                count -= 1
+
+            if self.size + count > len(self.buffers['Date']):
+                capacity = max(2 * len(self.buffers['Date']), self.size + count)
+                for column, buffer in self.buffers.items():
+                    grown = np.empty(capacity, dtype=buffer.dtype)
+                    grown[:self.size] = buffer[:self.size]
+                    self.buffers[column] = grown
+            for column, values in new.items():
+                self.buffers[column][self.size:self.size + count] = values
+            self.size += count
+            return self.bars
+        except Exception as e:
+            system_logger.error(f"Error updating {self.timeframe} bars: {e}")
+            raise
+
+    @property
+    def bars(self):
+        """
+        Resampled bars in the DataHandler schema.
+        Columns are views on the internal buffers, so the trailing bar changes with later updates.
+        """
+        data = pd.DataFrame({column: self.buffers[column][:self.size] for column in ['Date'] + self.COLUMNS}, copy=False)
+        if self.tz is not None:
+            data['Date'] = data['Date'].dt.tz_localize(self.tz)
+        return data
+
+
+class MultiTimeframeResampler:
+    def __init__(self, timeframes=('5min', '1h', '1D', '1W')):
+        """Maintain several timeframe views of the same base bars."""
+        self.resamplers = {timeframe: BarResampler(timeframe) for timeframe in timeframes}
+
+    def update(self, new_bars):
+        """Fold new base bars into every timeframe and return {timeframe: bars}."""
+        return {timeframe: resampler.update(new_bars) for timeframe, resampler in self.resamplers.items()}
+
+    def bars(self, timeframe):
+        """Return the bars for one timeframe."""
+        return self.resamplers[timeframe].bars
+
+# Example usage:
+# resampler = MultiTimeframeResampler()
+# views = resampler.update(minute_bars)
+# hourly = Indicators.relative_strength_index(views['1h'])
+# views = resampler.update(latest_minute_bars)  # only the trailing hourly/daily/weekly bars change
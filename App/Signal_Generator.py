@@ -4,6 +4,7 @@ import pandas as pd
 import numpy as np
 from Feature_engineering import FeatureEngineering
 from model import Model
+from Pattern_flags import PatternFlags, FLAG_COLUMN
 from sklearn.metrics import accuracy_score
 from Logger import System_Log
 
@@ -11,10 +12,25 @@ from Logger import System_Log
 system_logger = System_Log.setup_logger('signal_generator')
 
 class SignalGenerator:
+    # Columns read by generate_rule_based_signals, for FeatureEngineering.engineer_features(features=...)
+    REQUIRED_FEATURES = ['RSI', 'MACD', 'MACD_Signal', 'bullish_engulfing', 'bearish_engulfing']
+
+    @staticmethod
+    def pattern_mask(data, names):
+        """
+        Bool array, True where any of the named patterns fired. Uses the packed pattern_flags
+        column (one vectorised AND) when present, otherwise the individual flag columns.
+        """
+        if FLAG_COLUMN in data.columns:
+            return PatternFlags.any(data[FLAG_COLUMN], names)
+        names = [names] if isinstance(names, str) else names
+        return (data[names].to_numpy() != 0).any(axis=1)
+
     @staticmethod
     def generate_rule_based_signals(data):
         """
         Generate trading signals based on patterns and indicators.
+        Pattern flags may be boolean, uint8 or packed into pattern_flags.
         """
         try:
             data['Rule_Signal'] = 0
@@ -25,8 +41,8 @@ class SignalGenerator:
             data.loc[(data['RSI'] > 70) & (data['MACD'] < data['MACD_Signal']), 'Rule_Signal'] = -1
 
             # Add more rule-based signals as needed
-            data.loc[data['bullish_engulfing'], 'Rule_Signal'] = 1
-            data.loc[data['bearish_engulfing'], 'Rule_Signal'] = -1
+            data.loc[SignalGenerator.pattern_mask(data, 'bullish_engulfing'), 'Rule_Signal'] = 1
+            data.loc[SignalGenerator.pattern_mask(data, 'bearish_engulfing'), 'Rule_Signal'] = -1
 
             system_logger.info("Rule-based signals generated successfully.")
             return data
@@ -0,0 +1,298 @@
+# streaming_indicators.py
+
+import math
+from collections import deque
+from Logger import System_Log
+
+# Setup the logger
+system_logger = System_Log.setup_logger('streaming_indicators')
+
+NAN = float('nan')
+
+
+class StreamingIndicator:
+    """
+    Base class for incremental indicators.
+    Each subclass keeps a constant amount of state, is warmed up with seed(history) and then
+    advanced one bar at a time with update(bar), reproducing the batch ta values bar for bar.
+    Bars are mappings (dict, pandas row) holding the fields listed in FIELDS.
+    """
+    FIELDS = ('Close',)
+
+    def _step(self, *values):
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    def update(self, bar):
+        """Advance the state by one bar and return the latest indicator value."""
+        self.value = self._step(*(float(bar[field]) for field in self.FIELDS))
+        return self.value
+
+    def seed(self, data):
+        """Warm the state up on a DataFrame of historical bars and return the latest value."""
+        try:
+            self.value = None
+            for values in zip(*(data[field].to_numpy(dtype=float) for field in self.FIELDS)):
+                self.value = self._step(*values)
+            system_logger.info(f"{type(self).__name__} seeded with {len(data)} bars.")
+            return self.value
+        except Exception as e:
+            system_logger.error(f"Error seeding {type(self).__name__}: {e}")
+            raise
+
+
+class RollingSum:
+    """Fixed-window running sum; value is NaN until the window is full or while it holds a NaN."""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.total = 0.0
+        self.nans = 0
+
+    def push(self, value):
+        self.values.append(value)
+        if math.isnan(value):
+            self.nans += 1
+        else:
+            self.total += value
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+            if math.isnan(old):
+                self.nans -= 1
+            else:
+                self.total -= old
+        if len(self.values) < self.window or self.nans:
+            return NAN
+        return self.total
+
+
+class RollingExtreme:
+    """Fixed-window running max (or min) using a monotonic deque, amortised O(1) per value."""
+
+    def __init__(self, window, maximum=True):
+        self.window = window
+        self.sign = 1.0 if maximum else -1.0
+        self.candidates = deque()
+        self.count = 0
+
+    def push(self, value):
+        key = self.sign * value
+        while self.candidates and self.candidates[-1][1] <= key:
+            self.candidates.pop()
+        self.candidates.append((self.count, key))
+        if self.candidates[0][0] <= self.count - self.window:
+            self.candidates.popleft()
+        self.count += 1
+        if self.count < self.window:
+            return NAN
+        return self.sign * self.candidates[0][1]
+
+
+class EMAState(StreamingIndicator):
+    def __init__(self, window=20, alpha=None, min_periods=None):
+        """Exponential moving average (adjust=False), as ta.trend.EMAIndicator."""
+        self.alpha = alpha if alpha is not None else 2.0 / (window + 1)
+        self.min_periods = window if min_periods is None else min_periods
+        self.ema = None
+        self.count = 0
+        self.value = None
+
+    def push(self, value):
+        if math.isnan(value):
+            return self.current()
+        self.ema = value if self.ema is None else self.alpha * value + (1 - self.alpha) * self.ema
+        self.count += 1
+        return self.current()
+
+    def current(self):
+        return self.ema if self.count >= self.min_periods and self.ema is not None else NAN
+
+    def _step(self, close):
+        return self.push(close)
+
+
+class RSIState(StreamingIndicator):
+    def __init__(self, window=14):
+        """Relative Strength Index with Wilder smoothing, as ta.momentum.RSIIndicator."""
+        self.up = EMAState(alpha=1.0 / window, min_periods=window)
+        self.down = EMAState(alpha=1.0 / window, min_periods=window)
+        self.prev_close = NAN
+        self.value = None
+
+    def _step(self, close):
+        diff = close - self.prev_close
+        self.prev_close = close
+        ema_up = self.up.push(diff if diff > 0 else 0.0)
+        ema_down = self.down.push(-diff if diff < 0 else 0.0)
+        if ema_down == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + ema_up / ema_down)
+
+
+class MACDState(StreamingIndicator):
+    def __init__(self, window_slow=26, window_fast=12, window_sign=9):
+        """MACD line, signal and histogram, as ta.trend.MACD. update() returns (macd, signal, hist)."""
+        self.fast = EMAState(window_fast)
+        self.slow = EMAState(window_slow)
+        self.signal = EMAState(window_sign)
+        self.value = None
+
+    def _step(self, close):
+        macd = self.fast.push(close) - self.slow.push(close)
+        signal = self.signal.push(macd)
+        return macd, signal, macd - signal
+
+
+class ATRState(StreamingIndicator):
+    FIELDS = ('High', 'Low', 'Close')
+
+    def __init__(self, window=14):
+        """Average True Range with Wilder smoothing; 0 during warm-up, as ta.volatility.AverageTrueRange."""
+        self.window = window
+        self.prev_close = NAN
+        self.seed_total = 0.0
+        self.count = 0
+        self.atr = 0.0
+        self.value = None
+
+    def _step(self, high, low, close):
+        ranges = [high - low, abs(high - self.prev_close), abs(low - self.prev_close)]
+        true_range = max(r for r in ranges if not math.isnan(r))
+        self.prev_close = close
+        self.count += 1
+        if self.count < self.window:
+            self.seed_total += true_range
+        elif self.count == self.window:
+            self.atr = (self.seed_total + true_range) / self.window
+        else:
+            self.atr = (self.atr * (self.window - 1) + true_range) / self.window
+        return self.atr
+
+
+class OBVState(StreamingIndicator):
+    FIELDS = ('Close', 'Volume')
+
+    def __init__(self):
+        """On-Balance Volume, as ta.volume.OnBalanceVolumeIndicator."""
+        self.prev_close = NAN
+        self.obv = 0.0
+        self.value = None
+
+    def _step(self, close, volume):
+        self.obv += -volume if close < self.prev_close else volume
+        self.prev_close = close
+        return self.obv
+
+
+def _close_location(high, low, close):
+    if high == low:
+        return 0.0
+    clv = ((close - low) - (high - close)) / (high - low)
+    return 0.0 if math.isnan(clv) else clv
+
+
+class ADIState(StreamingIndicator):
+    FIELDS = ('High', 'Low', 'Close', 'Volume')
+
+    def __init__(self):
+        """Accumulation/Distribution Index, as ta.volume.AccDistIndexIndicator."""
+        self.adi = 0.0
+        self.value = None
+
+    def _step(self, high, low, close, volume):
+        self.adi += _close_location(high, low, close) * volume
+        return self.adi
+
+
+class StochasticState(StreamingIndicator):
+    FIELDS = ('High', 'Low', 'Close')
+
+    def __init__(self, window=14, smooth_window=3):
+        """Stochastic Oscillator, as ta.momentum.StochasticOscillator. update() returns (k, d)."""
+        self.high_max = RollingExtreme(window, maximum=True)
+        self.low_min = RollingExtreme(window, maximum=False)
+        self.k_sum = RollingSum(smooth_window)
+        self.smooth_window = smooth_window
+        self.value = None
+
+    def _step(self, high, low, close):
+        high_max = self.high_max.push(high)
+        low_min = self.low_min.push(low)
+        span = high_max - low_min
+        k = 100 * (close - low_min) / span if span != 0 else NAN
+        return k, self.k_sum.push(k) / self.smooth_window
+
+
+class BollingerState(StreamingIndicator):
+    def __init__(self, window=20, std_dev=2):
+        """Bollinger Bands from running sums, as ta.volatility.BollingerBands. update() returns (high, mid, low)."""
+        self.window = window
+        self.std_dev = std_dev
+        self.sum = RollingSum(window)
+        self.sum_sq = RollingSum(window)
+        self.value = None
+
+    def _step(self, close):
+        total = self.sum.push(close)
+        total_sq = self.sum_sq.push(close * close)
+        mean = total / self.window
+        std = math.sqrt(max(total_sq / self.window - mean * mean, 0.0)) if not math.isnan(total) else NAN
+        return mean + self.std_dev * std, mean, mean - self.std_dev * std
+
+
+class VWAPState(StreamingIndicator):
+    FIELDS = ('High', 'Low', 'Close', 'Volume')
+
+    def __init__(self, window=14):
+        """Rolling Volume Weighted Average Price, as ta.volume.VolumeWeightedAveragePrice."""
+        self.price_volume = RollingSum(window)
+        self.volume = RollingSum(window)
+        self.value = None
+
+    def _step(self, high, low, close, volume):
+        typical_price = (high + low + close) / 3.0
+        total_volume = self.volume.push(volume)
+        total_price_volume = self.price_volume.push(typical_price * volume)
+        return total_price_volume / total_volume if total_volume != 0 else NAN
+
+
+class MFIState(StreamingIndicator):
+    FIELDS = ('High', 'Low', 'Close', 'Volume')
+
+    def __init__(self, window=14):
+        """Money Flow Index, as ta.volume.MFIIndicator."""
+        self.positive = RollingSum(window)
+        self.negative = RollingSum(window)
+        self.prev_typical_price = NAN
+        self.value = None
+
+    def _step(self, high, low, close, volume):
+        typical_price = (high + low + close) / 3.0
+        direction = 1 if typical_price > self.prev_typical_price else (-1 if typical_price < self.prev_typical_price else 0)
+        self.prev_typical_price = typical_price
+        money_flow = typical_price * volume * direction
+        positive = self.positive.push(money_flow if money_flow >= 0 else 0.0)
+        negative = abs(self.negative.push(money_flow if money_flow < 0 else 0.0))
+        if negative == 0:
+            return 100.0 if positive > 0 else NAN
+        return 100 - 100 / (1 + positive / negative)
+
+
+class CMFState(StreamingIndicator):
+    FIELDS = ('High', 'Low', 'Close', 'Volume')
+
+    def __init__(self, window=20):
+        """Chaikin Money Flow, as ta.volume.ChaikinMoneyFlowIndicator."""
+        self.money_flow_volume = RollingSum(window)
+        self.volume = RollingSum(window)
+        self.value = None
+
+    def _step(self, high, low, close, volume):
+        total_mfv = self.money_flow_volume.push(_close_location(high, low, close) * volume)
+        total_volume = self.volume.push(volume)
+        return total_mfv / total_volume if total_volume != 0 else NAN
+
+# Example usage:
+# rsi = RSIState(window=14)
+# rsi.seed(history)
+# latest_rsi = rsi.update({'Close': 187.3})
@@ -0,0 +1,123 @@
+# streaming_patterns.py
+
+import numpy as np
+import pandas as pd
+from Logger import System_Log
+from Streaming_indicators import StreamingIndicator, NAN
+from Pattern_flags import PATTERN_BITS, FLAG_COLUMN
+
+# Setup the logger
+system_logger = System_Log.setup_logger('streaming_patterns')
+
+# Candlestick patterns looking back at most CANDLE_LOOKBACK bars, as in Patterns
+CANDLESTICK_PATTERNS = ('bullish_engulfing', 'bearish_engulfing', 'morning_star', 'evening_star', 'hammer', 'shooting_star')
+CANDLE_LOOKBACK = 3
+
+
+def _candlestick_flags(open_2, close_2, open_1, close_1, open_, high, low, close):
+    """
+    The Patterns candlestick predicates on the current bar and the two before it. Works on
+    floats and on NumPy arrays alike; comparisons with NaN (missing history) are False.
+    """
+    body_size = abs(close - open_)
+    return {
+        'bullish_engulfing': (open_1 > close_1) & (open_ < close) & (open_ < close_1) & (close > open_1),
+        'bearish_engulfing': (open_1 < close_1) & (open_ > close) & (open_ > close_1) & (close < open_1),
+        'morning_star': (close_2 < open_2) & (close_1 < open_1) & (close > open_),
+        'evening_star': (close_2 > open_2) & (close_1 > open_1) & (close < open_),
+        'hammer': (open_ - low > body_size * 2) & (close > open_),
+        'shooting_star': (high - close > body_size * 2) & (open_ > close),
+    }
+
+
+class CandlestickState(StreamingIndicator):
+    FIELDS = ('Open', 'High', 'Low', 'Close')
+
+    def __init__(self):
+        """
+        Candlestick patterns for one ticker from a ring buffer of the previous two bars.
+        update() returns {pattern: bool} for the new bar, identical to the Patterns methods
+        evaluated on the full frame.
+        """
+        self.opens = [NAN, NAN]
+        self.closes = [NAN, NAN]
+        self.value = None
+
+    def _step(self, open_, high, low, close):
+        flags = _candlestick_flags(self.opens[0], self.closes[0], self.opens[1], self.closes[1], open_, high, low, close)
+        self.opens = [self.opens[1], open_]
+        self.closes = [self.closes[1], close]
+        return {name: bool(flag) for name, flag in flags.items()}
+
+
+class CandlestickBook:
+    def __init__(self, tickers):
+        """
+        Candlestick patterns for a whole universe. The previous two bars of every ticker are
+        held in (tickers, 2) arrays, so a bar close across thousands of tickers is evaluated
+        with a handful of vectorised comparisons.
+        """
+        self.tickers = list(tickers)
+        self.positions = pd.Index(self.tickers)
+        self.opens = np.full((len(self.tickers), CANDLE_LOOKBACK - 1), np.nan)
+        self.closes = np.full((len(self.tickers), CANDLE_LOOKBACK - 1), np.nan)
+
+    def _rows(self, tickers):
+        rows = self.positions.get_indexer(tickers)
+        if (rows < 0).any():
+            raise KeyError(f"Unknown tickers: {list(pd.Index(tickers)[rows < 0])}")
+        return rows
+
+    def seed(self, frames):
+        """
+        Warm the buffers up from a dict of ticker -> historical OHLC frame. Slots without a
+        bar (frames shorter than two bars, including empty ones) stay unseeded NaN.
+        """
+        try:
+            for ticker, data in frames.items():
+                row = self._rows([ticker])[0]
+                tail = data.iloc[-(CANDLE_LOOKBACK - 1):]
+                self.opens[row] = np.nan
+                self.closes[row] = np.nan
+                if len(tail):
+                    self.opens[row, -len(tail):] = tail['Open'].to_numpy(dtype=float)
+                    self.closes[row, -len(tail):] = tail['Close'].to_numpy(dtype=float)
+            system_logger.info(f"Candlestick book seeded for {len(frames)} tickers.")
+            return self
+        except Exception as e:
+            system_logger.error(f"Error seeding candlestick book: {e}")
+            raise
+
+    def update(self, bars):
+        """
+        Advance the tickers in bars (a DataFrame indexed by ticker with Open, High, Low and
+        Close for the bar that just closed); tickers without a new bar are left untouched.
+        Returns the patterns of the new bars packed as in Pattern_flags: a uint32 Series
+        named pattern_flags, indexed like bars.
+        """
+        try:
+            rows = self._rows(bars.index)
+            open_ = bars['Open'].to_numpy(dtype=float)
+            close = bars['Close'].to_numpy(dtype=float)
+            opens, closes = self.opens[rows], self.closes[rows]
+            with np.errstate(invalid='ignore'):
+                flags = _candlestick_flags(opens[:, 0], closes[:, 0], opens[:, 1], closes[:, 1], open_,
+                                           bars['High'].to_numpy(dtype=float), bars['Low'].to_numpy(dtype=float), close)
+            packed = np.zeros(len(bars), dtype=np.uint32)
+            for name, flag in flags.items():
+                packed |= flag.astype(np.uint32) << np.uint32(PATTERN_BITS[name])
+
+            self.opens[rows] = np.column_stack([opens[:, 1], open_])
+            self.closes[rows] = np.column_stack([closes[:, 1], close])
+            return pd.Series(packed, index=bars.index, name=FLAG_COLUMN)
+        except Exception as e:
+            system_logger.error(f"Error updating candlestick book: {e}")
+            raise
+
+# Example usage:
+# state = CandlestickState()
+# state.seed(history)
+# flags = state.update({'Open': 186.1, 'High': 188.0, 'Low': 185.7, 'Close': 187.3})
+# book = CandlestickBook(tickers).seed(frames)
+# flags = book.update(latest_bars)
+# print(flags[PatternFlags.any(flags, ['bullish_engulfing', 'morning_star'])].index.tolist())
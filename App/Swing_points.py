@@ -0,0 +1,124 @@
+# swing_points.py
+
+import numpy as np
+import pandas as pd
+from Logger import System_Log
+from Kernels import rolling_extreme
+from App.Computation_cache import shared_cache
+
+# Setup the logger
+system_logger = System_Log.setup_logger('swing_points')
+
+PIVOT_HIGH = 1
+PIVOT_LOW = -1
+
+
+def _between(outer_bars, inner_bars, inner_prices, reducer, initial):
+    """
+    Reduce the inner pivots lying between each pair of consecutive outer pivots, e.g. the
+    deepest swing low between two swing highs. Gaps without an inner pivot hold initial.
+    """
+    result = np.full(max(len(outer_bars) - 1, 0), initial)
+    gap = np.searchsorted(outer_bars, inner_bars, side='right') - 1
+    inside = (gap >= 0) & (gap < len(result))
+    reducer.at(result, gap[inside], inner_prices[inside])
+    return result
+
+
+def _flags(length, confirmed):
+    flags = np.zeros(length, dtype=bool)
+    flags[confirmed[confirmed < length]] = True
+    return flags
+
+
+class SwingPoints:
+    @staticmethod
+    def detect(data, order=5):
+        """
+        Build the sparse pivot index of data.
+        A swing high is a bar whose High exceeds the previous order bars and is not exceeded by
+        the next order bars (swing lows likewise on Low). Rolling extremes come from a monotonic
+        deque, so detection is O(n). A pivot is only known order bars later, so each row records
+        its confirmation bar and patterns are flagged there, never using future bars.
+        Returns a DataFrame of pivots sorted by bar with columns bar, confirmed, price and kind
+        (PIVOT_HIGH or PIVOT_LOW).
+        """
+        def compute():
+            high = data['High'].to_numpy(dtype=float)
+            low = data['Low'].to_numpy(dtype=float)
+            pivots = []
+            for values, kind, sign in ((high, PIVOT_HIGH, 1.0), (low, PIVOT_LOW, -1.0)):
+                extreme = sign * rolling_extreme(values, order, maximum=sign > 0)
+                left = np.full(len(values), np.nan)
+                left[1:] = extreme[:-1]
+                right = np.full(len(values), np.nan)
+                right[:max(len(values) - order, 0)] = extreme[order:]
+                with np.errstate(invalid='ignore'):
+                    bars = np.flatnonzero((sign * values > left) & (sign * values >= right))
+                pivots.append(pd.DataFrame({'bar': bars, 'confirmed': bars + order, 'price': values[bars], 'kind': kind}))
+            return pd.concat(pivots, ignore_index=True).sort_values('bar', kind='stable', ignore_index=True)
+
+        try:
+            pivots = shared_cache.get_or_compute('swing_points', (data['High'], data['Low']), {'order': order}, compute)
+            system_logger.info(f"Detected {len(pivots)} swing points (order={order}) in {len(data)} bars.")
+            return pivots
+        except Exception as e:
+            system_logger.error(f"Error detecting swing points: {e}")
+            raise
+
+    @staticmethod
+    def _split(pivots):
+        highs = pivots[pivots['kind'] == PIVOT_HIGH]
+        lows = pivots[pivots['kind'] == PIVOT_LOW]
+        return (highs['bar'].to_numpy(), highs['confirmed'].to_numpy(), highs['price'].to_numpy(),
+                lows['bar'].to_numpy(), lows['confirmed'].to_numpy(), lows['price'].to_numpy())
+
+    @staticmethod
+    def double_top(pivots, length, tolerance=0.02):
+        """
+        Flag double tops: two consecutive swing highs within tolerance of each other, separated
+        by a swing low more than tolerance below the lower peak. Returns a bool array of length
+        bars, True on the bar confirming the second peak.
+        """
+        high_bars, high_confirmed, high_prices, low_bars, _, low_prices = SwingPoints._split(pivots)
+        first, second = high_prices[:-1], high_prices[1:]
+        trough = _between(high_bars, low_bars, low_prices, np.minimum, np.inf)
+        with np.errstate(invalid='ignore'):
+            match = ((np.abs(first - second) <= tolerance * np.maximum(first, second)) &
+                     (trough < np.minimum(first, second) * (1 - tolerance)))
+        return _flags(length, high_confirmed[1:][match])
+
+    @staticmethod
+    def head_and_shoulders(pivots, length, tolerance=0.02):
+        """
+        Flag head and shoulders tops: three consecutive swing highs whose middle (head) rises
+        more than tolerance above both shoulders, the shoulders being within tolerance of each
+        other, with a swing low on each side of the head. True on the bar confirming the right shoulder.
+        """
+        high_bars, high_confirmed, high_prices, low_bars, _, low_prices = SwingPoints._split(pivots)
+        left, head, right = high_prices[:-2], high_prices[1:-1], high_prices[2:]
+        trough = _between(high_bars, low_bars, low_prices, np.minimum, np.inf)
+        with np.errstate(invalid='ignore'):
+            match = ((head > np.maximum(left, right) * (1 + tolerance)) &
+                     (np.abs(left - right) <= tolerance * np.maximum(left, right)) &
+                     np.isfinite(trough[:-1]) & np.isfinite(trough[1:]))
+        return _flags(length, high_confirmed[2:][match])
+
+    @staticmethod
+    def triple_bottom(pivots, length, tolerance=0.02):
+        """
+        Flag triple bottoms: three consecutive swing lows within tolerance of each other, with a
+        swing high more than tolerance above them in both gaps. True on the bar confirming the third low.
+        """
+        high_bars, _, high_prices, low_bars, low_confirmed, low_prices = SwingPoints._split(pivots)
+        lows = np.column_stack([low_prices[:-2], low_prices[1:-1], low_prices[2:]]) if len(low_prices) > 2 else np.empty((0, 3))
+        peak = _between(low_bars, high_bars, high_prices, np.maximum, -np.inf)
+        with np.errstate(invalid='ignore'):
+            ceiling = lows.max(axis=1) * (1 + tolerance)
+            match = ((lows.max(axis=1) - lows.min(axis=1) <= tolerance * lows.max(axis=1)) &
+                     (peak[:-1] > ceiling) & (peak[1:] > ceiling))
+        return _flags(length, low_confirmed[2:][match])
+
+# Example usage:
+# pivots = SwingPoints.detect(data, order=5)
+# data['double_top'] = SwingPoints.double_top(pivots, len(data))
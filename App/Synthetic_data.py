@@ -0,0 +1,113 @@
+# synthetic_data.py
+
+import numpy as np
+import pandas as pd
+from App.Logger import System_Log
+
+# Setup the logger
+system_logger = System_Log.setup_logger('synthetic_data')
+
+class SyntheticMarketData:
+    # (annual drift, annual volatility) of each market regime
+    REGIMES = {
+        'bull': (0.15, 0.15),
+        'bear': (-0.20, 0.35),
+        'calm': (0.05, 0.08),
+    }
+
+    def __init__(self, seed=None, periods_per_year=252):
+        """Initialise a seeded generator of synthetic OHLCV bars."""
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.periods_per_year = periods_per_year
+
+    def generate_arrays(self, n_tickers, n_bars, start_price=100.0, switch_prob=0.02, gap_prob=0.01,
+                        gap_scale=0.04, base_volume=1e6):
+        """
+        Generate (n_bars, n_tickers) Open/High/Low/Close/Volume arrays in one vectorized pass.
+        Closes follow a geometric Brownian motion whose drift and volatility switch between
+        REGIMES as a per-ticker Markov chain; opens add overnight noise plus occasional jump
+        gaps, and volume scales with the size of each bar's move.
+        """
+        try:
+            rng = self.rng
+            shape = (n_bars, n_tickers)
+            dt = 1.0 / self.periods_per_year
+            drifts = np.array([drift for drift, _ in self.REGIMES.values()])
+            vols = np.array([vol for _, vol in self.REGIMES.values()])
+
+            # Regime path: a new regime is drawn for each segment between switch events
+            segment = np.cumsum(rng.random(shape) < switch_prob, axis=0)
+            labels = rng.integers(0, len(self.REGIMES), size=(n_bars + 1, n_tickers), dtype=np.int8)
+            regime = np.take_along_axis(labels, segment, axis=0)
+            mu, sigma = drifts[regime], vols[regime]
+            step_vol = sigma * np.sqrt(dt)
+
+            shocks = rng.standard_normal(shape)
+            intraday = (mu - 0.5 * sigma ** 2) * dt + step_vol * shocks
+            overnight = 0.25 * step_vol * rng.standard_normal(shape)
+            overnight += np.where(rng.random(shape) < gap_prob, gap_scale * rng.standard_normal(shape), 0.0)
+            overnight[0] = 0.0
+
+            log_close = np.log(start_price) + np.cumsum(overnight + intraday, axis=0)
+            close = np.exp(log_close)
+            open_ = np.exp(log_close - intraday)
+            wick = np.abs(rng.standard_normal((2,) + shape)) * 0.5 * step_vol
+            high = np.maximum(open_, close) * np.exp(wick[0])
+            low = np.minimum(open_, close) * np.exp(-wick[1])
+
+            ticker_volume = base_volume * rng.lognormal(0.0, 1.0, size=n_tickers)
+            volume = ticker_volume * rng.lognormal(0.0, 0.3, size=shape) * (1.0 + np.abs(shocks))
+            return {
+                'Open': open_,
+                'High': high,
+                'Low': low,
+                'Close': close,
+                'Volume': volume.astype(np.int64),
+            }
+        except Exception as e:
+            system_logger.error(f"Error generating synthetic arrays: {e}")
+            raise
+
+    def generate(self, n_tickers=1, n_bars=252, start_date='2020-01-01', freq='B', ticker_prefix='SYN', **kwargs):
+        """
+        Generate n_tickers frames of n_bars each in the DataHandler schema.
+        Returns {ticker: DataFrame} with Date, Open, High, Low, Close and Volume columns.
+        """
+        try:
+            dates = pd.date_range(start_date, periods=n_bars, freq=freq)
+            arrays = self.generate_arrays(n_tickers, n_bars, **kwargs)
+            frames = {
+                f"{ticker_prefix}{i:04d}": pd.DataFrame({'Date': dates, **{column: values[:, i] for column, values in arrays.items()}})
+                for i in range(n_tickers)
+            }
+            system_logger.info(f"Generated {n_tickers} synthetic tickers of {n_bars} bars.")
+            return frames
+        except Exception as e:
+            system_logger.error(f"Error generating synthetic data: {e}")
+            raise
+
+    def generate_long(self, n_tickers=1, n_bars=252, start_date='2020-01-01', freq='B', ticker_prefix='SYN', **kwargs):
+        """
+        Generate the same data as generate() as one long frame with a Ticker column.
+        """
+        try:
+            dates = pd.date_range(start_date, periods=n_bars, freq=freq)
+            arrays = self.generate_arrays(n_tickers, n_bars, **kwargs)
+            tickers = np.array([f"{ticker_prefix}{i:04d}" for i in range(n_tickers)])
+            data = pd.DataFrame({
+                'Ticker': np.repeat(tickers, n_bars),
+                'Date': np.tile(dates.to_numpy(), n_tickers),
+                # Transpose so each ticker's bars are contiguous
+                **{column: values.T.ravel() for column, values in arrays.items()},
+            })
+            system_logger.info(f"Generated {n_tickers} synthetic tickers of {n_bars} bars in long format.")
+            return data
+        except Exception as e:
+            system_logger.error(f"Error generating synthetic data in long format: {e}")
+            raise
+
+# Example usage:
+# frames = SyntheticMarketData(seed=42).generate(n_tickers=500, n_bars=2520)
+# data = frames['SYN0000']
+# data = FeatureEngineering.engineer_features(data)
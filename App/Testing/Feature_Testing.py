@@ -0,0 +1,63 @@
+import sys
+import os
+import tempfile
+import numpy as np
+# App modules import each other both as App.<module> and by bare module name
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from App.Synthetic_data import SyntheticMarketData
+from App.Feature_engineering import FeatureEngineering, LAG_SUFFIX
+from App.Feature_store import FeatureStore
+from App.Pattern_flags import PatternFlags, PATTERN_BITS, PATTERN_HELPERS, FLAG_COLUMN
+from App.model import Model
+
+PATTERNS = list(PATTERN_BITS)
+
+data = SyntheticMarketData(seed=42).generate(n_tickers=1, n_bars=1200)['SYN0000']
+
+# Packed pipeline: one uint32 bitmask in place of the flag columns, their lags and helpers
+unpacked = FeatureEngineering.engineer_features(data.copy(), normalise=False)
+packed = FeatureEngineering.engineer_features(data.copy(), normalise=False, packed=True)
+print(f"Unpacked: {unpacked.shape[1]} columns, packed: {packed.shape[1]} columns")
+assert packed[FLAG_COLUMN].dtype == np.uint32
+flag_columns = [col for col in packed.columns
+                if col in PATTERNS + PATTERN_HELPERS or (LAG_SUFFIX.match(col) and LAG_SUFFIX.match(col).group('column') in PATTERNS + [FLAG_COLUMN])]
+assert not flag_columns, f"Flag columns left in packed output: {flag_columns}"
+assert packed['Date'].equals(unpacked['Date'])
+assert PatternFlags.unpack(packed).equals(unpacked[PATTERNS].astype(bool))
+shared = [col for col in packed.columns if col != FLAG_COLUMN]
+assert packed[shared].equals(unpacked[shared])
+
+# The bitmask is neither scaled nor lagged when normalising
+normalised = FeatureEngineering.engineer_features(data.copy(), packed=True)
+assert normalised[FLAG_COLUMN].equals(packed[FLAG_COLUMN])
+
+# Engineering an already packed frame without packed replaces the bitmask by the flag columns
+repacked = FeatureEngineering.engineer_features(FeatureEngineering.add_patterns(data.copy(), packed=True), normalise=False)
+assert FLAG_COLUMN not in repacked.columns and all(name in repacked.columns for name in PATTERNS)
+
+# Requested features: the requested flags are packed, their lags kept
+selected = FeatureEngineering.engineer_features(data.copy(), features=['RSI', 'hammer', 'bullish_engulfing', 'hammer_lag1'], packed=True)
+assert list(selected.columns[-3:]) == ['RSI', 'hammer_lag1', FLAG_COLUMN]
+rows = packed.index
+assert PatternFlags.unpack(selected.loc[rows], ['hammer']).equals(PatternFlags.unpack(packed, ['hammer']))
+
+# Feature store: packed and unpacked stores are kept apart, and appends match a full run
+store_dir = tempfile.mkdtemp()
+store = FeatureStore(store_dir, packed=True)
+assert store.config_hash != FeatureStore(store_dir).config_hash
+store.update('SYN0000', data.iloc[:900])
+for end in (950, 1000, 1200):
+    stored = store.update('SYN0000', data.iloc[:end])
+assert stored[FLAG_COLUMN].dtype == np.uint32
+expected = packed.reset_index(drop=True)
+assert stored['Date'].equals(expected['Date']) and stored[FLAG_COLUMN].equals(expected[FLAG_COLUMN])
+errors = store.verify('SYN0000', data)
+print(f"Largest relative difference of stored features: {errors.max():.2e}")
+assert errors.max() < 1e-5
+
+# The model sees the unpacked pattern bits
+normalised['Signal'] = (normalised['Close'].shift(-1) > normalised['Close']).astype(int)
+model, accuracy = Model.train_model(normalised)
+assert model.n_features_in_ == normalised.shape[1] - 8 + len(PATTERNS)
+print(f"Model trained on packed features with accuracy {accuracy:.2f}")
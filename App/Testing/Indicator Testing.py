@@ -1,14 +1,23 @@
-import yfinance as yf
 import matplotlib.pyplot as plt
 import pandas as pd
 from App.Indicators import Indicators
+from App.Synthetic_data import SyntheticMarketData
 
-# Fetch Apple stock data
-symbol = "AAPL"
-data = yf.download(symbol, period="6mo", interval="1d")
+# Set to False to test against live Yahoo Finance data instead of seeded synthetic bars
+USE_SYNTHETIC_DATA = True
 
-# Flatten MultiIndex DataFrame
-data.columns = [col[0] for col in data.columns]  # Keep only first level (Price)
+if USE_SYNTHETIC_DATA:
+    symbol = "SYN0000"
+    data = SyntheticMarketData(seed=42).generate(n_tickers=1, n_bars=126)[symbol].set_index('Date')
+else:
+    import yfinance as yf
+
+    # Fetch Apple stock data
+    symbol = "AAPL"
+    data = yf.download(symbol, period="6mo", interval="1d")
+
+    # Flatten MultiIndex DataFrame
+    data.columns = [col[0] for col in data.columns]  # Keep only first level (Price)
 
 # Ensure 'Close' column is accessible
 if "Close" not in data.columns:
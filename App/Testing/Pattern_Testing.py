@@ -0,0 +1,36 @@
+import sys
+import os
+# App modules import each other both as App.<module> and by bare module name
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from App.Synthetic_data import SyntheticMarketData
+from App.Feature_engineering import FeatureEngineering
+from App.Pattern_engine import PatternEngine
+from App.Pattern_scanner import PatternScanner
+from App.Patterns import Patterns
+from App.Swing_points import SwingPoints
+
+SWING_PATTERNS = ['double_top', 'head_and_shoulders', 'triple_bottom']
+
+data = SyntheticMarketData(seed=42).generate(n_tickers=1, n_bars=12)['SYN0000']
+
+# Frames shorter than the swing-point order (5) have no confirmed pivots: the swing-point
+# patterns are all False instead of raising
+for bars in range(len(data) + 1):
+    short = data.iloc[:bars].reset_index(drop=True)
+    pivots = SwingPoints.detect(short)
+    assert bars > 5 or pivots.empty, f"Unexpected pivots in {bars} bars"
+
+    fused = FeatureEngineering.add_patterns(short.copy())
+    block = PatternEngine.compute(short)
+    unfused = Patterns.triple_bottom(Patterns.head_and_shoulders(Patterns.double_top(short.copy())))
+    assert len(fused) == len(block) == len(unfused) == bars
+    if bars <= 5:
+        assert not fused[SWING_PATTERNS].to_numpy().any()
+        assert not unfused[SWING_PATTERNS].to_numpy().any()
+    print(f"{bars} bars: {len(pivots)} pivots, {int(fused[SWING_PATTERNS].to_numpy().sum())} swing patterns")
+
+# A ticker with a short history is scanned rather than logged and skipped
+events = PatternScanner.scan({'SHORT': data.iloc[:3], 'FULL': data}, max_workers=1)
+print(f"Scanned {len({event.ticker for event in events})} tickers, {len(events)} events")
+print(PatternScanner.to_frame(events))
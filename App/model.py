@@ -1,24 +1,42 @@
 # model.py
 
 import pandas as pd
+import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score
 import joblib
 from Logger import System_Log
+from Pattern_flags import PatternFlags, PATTERN_BITS, FLAG_COLUMN
 
 # Setup the logger
 system_logger = System_Log.setup_logger('model')
 
+
+def _feature_matrix(data, exclude):
+    """
+    float32 feature matrix of every column not in exclude. A packed FLAG_COLUMN is replaced
+    by the 0/1 columns of the patterns not already in data: as a single float32 its bits
+    above 2**24 would be rounded away, and its integer value carries no order to split on.
+    """
+    feature_columns = [col for col in data.columns if col not in exclude]
+    X = data[feature_columns]
+    if FLAG_COLUMN in feature_columns:
+        missing = [name for name in PATTERN_BITS if name not in X.columns]
+        X = pd.concat([X.drop(columns=FLAG_COLUMN), PatternFlags.unpack(X[FLAG_COLUMN], missing)], axis=1)
+    return X.astype(np.float32, copy=False)
+
 class Model:
     @staticmethod
     def train_model(data, target_column='Signal'):
         """
         Train a machine learning model to generate trading signals.
+        Features are passed as float32, the precision the tree ensemble works in, so compact
+        float32/uint8 features from engineer_features are used without a float64 copy; a
+        packed pattern_flags column is unpacked into its pattern bits.
         """
         try:
-            feature_columns = [col for col in data.columns if col not in ['Date', 'Open', 'High', 'Low', 'Close', 'Volume', target_column]]
-            X = data[feature_columns]
+            X = _feature_matrix(data, ['Date', 'Open', 'High', 'Low', 'Close', 'Volume', target_column])
             y = data[target_column]
 
             X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
@@ -66,8 +84,7 @@ class Model:
         Apply a trained model to generate trading signals.
         """
         try:
-            feature_columns = [col for col in data.columns if col not in ['Date', 'Open', 'High', 'Low', 'Close', 'Volume', 'Signal']]
-            X = data[feature_columns]
+            X = _feature_matrix(data, ['Date', 'Open', 'High', 'Low', 'Close', 'Volume', 'Signal'])
             data['Model_Signal'] = model.predict(X)
             system_logger.info("Model signals applied successfully.")
             return data
@@ -3,6 +3,25 @@
 
 #Set log path
 LOG_PATH = 'logs/system.log'
+
+#Local OHLCV bar cache (one Parquet file per source/ticker)
+BAR_CACHE_DIR = 'data/bar_cache'
+
+#Memory-mapped bar store shared by worker processes
+BAR_STORE_DIR = 'data/bar_store'
+
+#Engineered features persisted per (ticker, pipeline config) for incremental updates
+FEATURE_STORE_DIR = 'data/feature_store'
+
+#Request rate limits used when loading many tickers concurrently
+YFINANCE_REQUESTS_PER_SECOND = 2
+ALPACA_REQUESTS_PER_SECOND = 3
+
+#Compile recursive indicator kernels with Numba when it is installed
+USE_NUMBA = True
+
+#Precision of engineered features: None keeps float64, 'float32' halves memory (pattern flags become uint8)
+FEATURE_DTYPE = None
 # Other configuration variables...
 
 